@@ -1,12 +1,37 @@
+import os
 import shutil
 import argparse
+import itertools
+import contextlib
+import subprocess
 from pathlib import Path
 
 # Configuration
 ROOT_DIR = Path.cwd()
 STAGING_DIR = ROOT_DIR / "notebooklm-import-raw"
+PREVIEW_LIMIT = 5
 
-def cleanup_staging(force=False):
+def walk_files(directory):
+    """Yields a DirEntry for every file below directory (recursive scandir)."""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+def remove_tree(directory):
+    """
+    Deletes a directory tree. On POSIX this is delegated to `rm -rf`, which
+    unlinks entries in C without shutil.rmtree's per-entry Python callbacks.
+    """
+    rm = shutil.which("rm") if os.name == "posix" else None
+    if rm:
+        subprocess.run([rm, "-rf", "--", str(directory)], check=True)
+    else:
+        shutil.rmtree(directory)
+
+def cleanup_staging(force=False, verbose=False):
     """
     Removes the staging directory and all its contents (including empty subdirectories).
     """
@@ -14,16 +39,25 @@ def cleanup_staging(force=False):
         print(f"[INFO] Staging directory {STAGING_DIR} does not exist. Nothing to clean.")
         return
 
-    # Check for remaining files (unprocessed)
-    remaining_files = [f for f in STAGING_DIR.rglob("*") if f.is_file()]
+    # Check for remaining files (unprocessed); stop scanning once the preview is full.
+    # The walk is closed before anything is deleted, so no scandir handle stays open.
+    with contextlib.closing(walk_files(STAGING_DIR)) as files:
+        remaining_files = [entry.path for entry in itertools.islice(files, PREVIEW_LIMIT + 1)]
+        has_more = len(remaining_files) > PREVIEW_LIMIT
+        total = len(remaining_files) + sum(1 for _ in files) if has_more and verbose else None
     
     if remaining_files:
-        print(f"[WARN] Staging directory contains {len(remaining_files)} files.")
+        if not has_more:
+            print(f"[WARN] Staging directory contains {len(remaining_files)} files.")
+        elif verbose:
+            print(f"[WARN] Staging directory contains {total} files.")
+        else:
+            print(f"[WARN] Staging directory contains more than {PREVIEW_LIMIT} files.")
         if not force:
             print("Files found:")
-            for f in remaining_files[:5]:
-                print(f" - {f.relative_to(STAGING_DIR)}")
-            if len(remaining_files) > 5:
+            for f in remaining_files[:PREVIEW_LIMIT]:
+                print(f" - {os.path.relpath(f, STAGING_DIR)}")
+            if has_more:
                 print(" ...")
             
             confirm = input("These files may be unprocessed. Delete anyway? (yes/no): ")
@@ -33,7 +67,7 @@ def cleanup_staging(force=False):
 
     print(f"[INFO] Removing staging area: {STAGING_DIR}...")
     try:
-        shutil.rmtree(STAGING_DIR)
+        remove_tree(STAGING_DIR)
         print("[SUCCESS] Cleanup complete. Staging area removed.")
     except Exception as e:
         print(f"[ERROR] Failed to remove staging directory: {e}")
@@ -41,6 +75,7 @@ def cleanup_staging(force=False):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Staging Area Cleanup Tool")
     parser.add_argument("--force", action="store_true", help="Force deletion of remaining files without confirmation")
+    parser.add_argument("--verbose", action="store_true", help="Count every remaining file instead of stopping at the preview limit")
     args = parser.parse_args()
     
-    cleanup_staging(args.force)
\ No newline at end of file
+    cleanup_staging(args.force, args.verbose)
\ No newline at end of file
@@ -1,67 +1,361 @@
+import io
+import os
+import gzip
 import json
+import mmap
+import argparse
 import datetime
+import hashlib
+import zlib
+import tarfile
+import contextlib
 from pathlib import Path
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 ROOT_DIR = Path.cwd()
 ARCHIVE_DIR = ROOT_DIR / "knowledge-archive"
 INDEX_DIR = ROOT_DIR / "_indexes"
-BACKUP_FILENAME = f"knowledge-archive-backup-{datetime.date.today().isoformat()}.json"
-EXPORT_FILE = ROOT_DIR / BACKUP_FILENAME
+BACKUP_STEM = f"knowledge-archive-backup-{datetime.date.today().isoformat()}"
+EXPORT_FILE = ROOT_DIR / f"{BACKUP_STEM}.ndjson"
+META_FILE = ROOT_DIR / f"{BACKUP_STEM}.meta.json"
+LEGACY_EXPORT_FILE = ROOT_DIR / f"{BACKUP_STEM}.json"
+TAR_EXPORT_FILE = ROOT_DIR / f"{BACKUP_STEM}.tar.gz"
+TAR_MANIFEST_FILE = ROOT_DIR / f"{BACKUP_STEM}.manifest.json"
+BACKUP_MANIFEST_FILE = ROOT_DIR / "knowledge-archive-backup.manifest.json"
+WRITE_BUFFER_SIZE = 1 << 20
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+def walk_files(directory):
+    """
+    Recursively yields DirEntry objects for the files under directory.
+    Entry types come from the directory listing, so no per-file stat() is needed.
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+def iter_directory_paths(directory):
+    """
+    Yields (file_path, rel_path) for every file under the directory.
+    """
+    if not directory.exists():
+        return
+
+    print(f"Scanning {directory.name}...")
+    for entry in walk_files(directory):
+        # Use relative path for portability
+        yield entry.path, os.path.relpath(entry.path, ROOT_DIR).replace(os.sep, '/')
+
+def read_bytes(file_path):
+    """
+    Reads a file through a read-only memory map, skipping the stdio buffer copy.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+def read_text(file_path):
+    """Decodes a file as UTF-8, replacing undecodable bytes."""
+    return read_bytes(file_path).decode('utf-8', errors='replace')
+
+class HashingReader:
+    """File wrapper that feeds every block read into a sha256 digest."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+def iter_directory(directory):
+    """
+    Yields one {"path", "content"} record per file under the directory.
+    """
+    for file_path, rel_path in iter_directory_paths(directory):
+        try:
+            # Read content
+            content = read_text(file_path)
+
+            yield {
+                "path": rel_path,
+                "content": content
+            }
+        except Exception as e:
+            print(f"Failed to read {file_path}: {e}")
+
+def json_bytes(obj, indent=False, newline=False):
+    """
+    Serializes obj to UTF-8 JSON bytes (non-ASCII kept as-is), through orjson
+    when it is installed and the stdlib encoder otherwise.
+    """
+    if orjson:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_APPEND_NEWLINE if newline else 0)
+        return orjson.dumps(obj, option=option)
+    text = json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+    return (text + '\n' if newline else text).encode('utf-8')
+
+def output_path(path, compress):
+    """Final file name for an export, including the compression suffix if any."""
+    if not compress:
+        return path
+    return path.with_name(path.name + (".zst" if zstandard else ".gz"))
+
+@contextlib.contextmanager
+def open_output(path, compress):
+    """
+    Opens an export file for binary writing. With compress set, output is
+    streamed through zstd when the zstandard package is installed and through
+    the stdlib gzip module otherwise.
+    """
+    if not compress:
+        with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+    elif zstandard:
+        with open(path, 'wb') as raw:
+            with zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1).stream_writer(raw) as f:
+                yield f
+    else:
+        with gzip.open(path, 'wb', compresslevel=GZIP_LEVEL) as f:
+            yield f
+
+def load_backup_manifest():
+    """
+    Returns (files, backup_path) from the previous export's manifest.
+    backup_path is None unless the previous backup is an uncompressed NDJSON
+    file that is still on disk at its recorded size, i.e. safe to splice from.
+    """
+    try:
+        with open(BACKUP_MANIFEST_FILE, 'rb') as f:
+            manifest = orjson.loads(f.read()) if orjson else json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+
+    files = manifest.get("files")
+    if not isinstance(files, dict):
+        return {}, None
+    if manifest.get("compressed"):
+        return files, None
+    backup_path = ROOT_DIR / manifest.get("backup", "")
+    try:
+        if backup_path.stat().st_size != manifest.get("backup_size"):
+            return files, None
+    except OSError:
+        return files, None
+    return files, backup_path
+
+def read_previous_record(old, entry, st):
+    """
+    Returns a file's line from the previous backup, or None when the file has
+    changed since, or the recorded byte range no longer holds the line that
+    was written there (length and CRC-32 are checked against the manifest).
+    """
+    try:
+        if (entry["size"], entry["mtime_ns"]) != (st.st_size, st.st_mtime_ns) or not isinstance(entry["sha256"], str):
+            return None
+        old.seek(entry["offset"])
+        line = old.read(entry["length"])
+        if len(line) == entry["length"] and zlib.crc32(line) == entry["crc32"]:
+            return line
+    except (KeyError, TypeError, ValueError, OSError):
+        pass
+    return None
+
+def build_meta():
+    """Export header shared by both backup formats."""
+    return {
+        "export_date": datetime.datetime.now().isoformat(),
+        "source_root": str(ROOT_DIR),
+        "version": "1.0"
+    }
 
-def export_archive():
+def iter_files():
+    """Yields every exportable record from the core directories."""
+    for directory in (ARCHIVE_DIR, INDEX_DIR):
+        yield from iter_directory(directory)
+
+def export_archive(compress=False, full=False):
+    """
+    Exports the knowledge-archive and _indexes directories as JSON Lines:
+    one {"path", "content"} record per line, with the export header written
+    to a separate .meta.json sidecar.
+
+    A manifest of (size, mtime_ns, sha256) plus each record's byte range and
+    CRC-32 is kept next to the backup. Files whose size and mtime are unchanged
+    since the previous uncompressed export are not re-read; their line is
+    copied straight from the previous backup instead, once the copied bytes
+    match the recorded CRC.
+    """
+    export_file = output_path(EXPORT_FILE, compress)
+    print(f"Initiating export to {export_file}...")
+
+    if not ARCHIVE_DIR.exists():
+        print(f"Error: Archive directory {ARCHIVE_DIR} not found.")
+        return
+
+    previous, previous_backup = ({}, None) if full else load_backup_manifest()
+    files = {}
+    offset = 0
+    reused = 0
+    # Written beside the target first: the previous backup may be the same file
+    tmp_file = export_file.with_name(export_file.name + ".tmp")
+
+    # Write Backup
+    try:
+        with open(META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(build_meta(), f, indent=2)
+
+        with contextlib.ExitStack() as stack:
+            old = stack.enter_context(open(previous_backup, 'rb')) if previous_backup else None
+            f = stack.enter_context(open_output(tmp_file, compress))
+            for directory in (ARCHIVE_DIR, INDEX_DIR):
+                for file_path, rel_path in iter_directory_paths(directory):
+                    try:
+                        st = os.stat(file_path)
+                        entry = previous.get(rel_path)
+                        line = read_previous_record(old, entry, st) if old and entry else None
+                        if line is not None:
+                            digest = entry["sha256"]
+                            reused += 1
+                        else:
+                            raw = read_bytes(file_path)
+                            digest = hashlib.sha256(raw).hexdigest()
+                            record = {"path": rel_path, "content": raw.decode('utf-8', errors='replace')}
+                            line = json_bytes(record, newline=True)
+                    except Exception as e:
+                        print(f"Failed to read {file_path}: {e}")
+                        continue
+
+                    f.write(line)
+                    files[rel_path] = {
+                        "size": st.st_size,
+                        "mtime_ns": st.st_mtime_ns,
+                        "sha256": digest,
+                        "offset": offset,
+                        "length": len(line),
+                        "crc32": zlib.crc32(line)
+                    }
+                    offset += len(line)
+
+        os.replace(tmp_file, export_file)
+        with open(BACKUP_MANIFEST_FILE, 'wb') as f:
+            f.write(json_bytes({
+                "backup": export_file.name,
+                "backup_size": export_file.stat().st_size,
+                "compressed": compress,
+                "files": files
+            }, indent=True))
+        print(f"Success: Export complete. {len(files)} files bundled ({reused} unchanged).")
+    except Exception as e:
+        tmp_file.unlink(missing_ok=True)
+        print(f"Error writing backup file: {e}")
+
+def export_archive_legacy(compress=False):
     """
     Bundles the knowledge-archive and _indexes directories into a single JSON file.
+    Records are streamed to disk one at a time so memory stays bounded by the
+    largest single file rather than the whole archive.
     """
-    print(f"Initiating export to {EXPORT_FILE}...")
-    
+    export_file = output_path(LEGACY_EXPORT_FILE, compress)
+    print(f"Initiating export to {export_file}...")
+
     if not ARCHIVE_DIR.exists():
         print(f"Error: Archive directory {ARCHIVE_DIR} not found.")
         return
 
-    backup_payload = {
-        "meta": {
-            "export_date": datetime.datetime.now().isoformat(),
-            "source_root": str(ROOT_DIR),
-            "version": "1.0"
-        },
-        "files": []
-    }
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    count = 0
 
-    # Helper to add files
-    def add_directory(directory):
-        if not directory.exists():
-            return
-        
-        print(f"Scanning {directory.name}...")
-        for file_path in directory.rglob("*"):
-            if file_path.is_file():
-                try:
-                    # Use relative path for portability
-                    rel_path = file_path.relative_to(ROOT_DIR).as_posix()
-                    
-                    # Read content
-                    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                        content = f.read()
-                    
-                    backup_payload["files"].append({
-                        "path": rel_path,
-                        "content": content
-                    })
-                except Exception as e:
-                    print(f"Failed to read {file_path}: {e}")
+    # Write Backup
+    try:
+        with open_output(export_file, compress) as raw, io.TextIOWrapper(raw, encoding='utf-8') as f:
+            f.write('{"meta": ')
+            f.write(encoder.encode(build_meta()))
+            f.write(', "files": [')
+
+            for record in iter_files():
+                if count:
+                    f.write(', ')
+                for chunk in encoder.iterencode(record):
+                    f.write(chunk)
+                count += 1
+
+            f.write(']}')
+        print(f"Success: Export complete. {count} files bundled.")
+    except Exception as e:
+        print(f"Error writing backup file: {e}")
+
+def export_archive_tar():
+    """
+    Streams raw file bytes into a gzipped tarball and writes a small JSON
+    manifest (path, size, mtime, sha256) alongside it. Content is never
+    decoded or JSON-escaped, so binary files survive byte-for-byte.
+    """
+    print(f"Initiating export to {TAR_EXPORT_FILE}...")
+
+    if not ARCHIVE_DIR.exists():
+        print(f"Error: Archive directory {ARCHIVE_DIR} not found.")
+        return
 
-    # Scan Core Directories
-    add_directory(ARCHIVE_DIR)
-    add_directory(INDEX_DIR)
+    entries = []
 
     # Write Backup
     try:
-        with open(EXPORT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(backup_payload, f, indent=2)
-        print(f"Success: Export complete. {len(backup_payload['files'])} files bundled.")
+        with open(TAR_EXPORT_FILE, 'wb') as raw, tarfile.open(fileobj=raw, mode='w|gz') as tar:
+            for directory in (ARCHIVE_DIR, INDEX_DIR):
+                for file_path, rel_path in iter_directory_paths(directory):
+                    try:
+                        with open(file_path, 'rb') as f:
+                            info = tar.gettarinfo(arcname=rel_path, fileobj=f)
+                            # Hash the bytes as tarfile streams them, so each file is read once
+                            reader = HashingReader(f)
+                            tar.addfile(info, reader)
+                    except Exception as e:
+                        print(f"Failed to read {file_path}: {e}")
+                        continue
+
+                    entries.append({
+                        "path": rel_path,
+                        "size": info.size,
+                        "mtime": info.mtime,
+                        "sha256": reader.digest.hexdigest()
+                    })
+
+        with open(TAR_MANIFEST_FILE, 'wb') as f:
+            f.write(json_bytes({"meta": build_meta(), "files": entries}, indent=True))
+        print(f"Success: Export complete. {len(entries)} files bundled.")
     except Exception as e:
         print(f"Error writing backup file: {e}")
 
 if __name__ == "__main__":
-    export_archive()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Knowledge Archive Backup Tool")
+    parser.add_argument("--legacy-json", action="store_true", help="Write a single JSON document instead of JSON Lines")
+    parser.add_argument("--tar", action="store_true", help="Write raw file bytes to a .tar.gz with a JSON manifest sidecar")
+    parser.add_argument("--compress", action="store_true", help="Compress the JSON output (zstd if installed, gzip otherwise)")
+    parser.add_argument("--full", action="store_true", help="Re-read every file instead of reusing unchanged records from the previous backup")
+    args = parser.parse_args()
+
+    if args.tar:
+        export_archive_tar()
+    elif args.legacy_json:
+        export_archive_legacy(args.compress)
+    else:
+        export_archive(args.compress, args.full)
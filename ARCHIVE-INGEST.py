@@ -1,34 +1,115 @@
-import tkinter as tk
+import sys
+import shutil
 import datetime
 import re
+import subprocess
 from pathlib import Path
 
 # Configuration
 ROOT_DIR = Path.cwd()
 STAGING_DIR = ROOT_DIR / "notebooklm-import-raw"
+WRITE_CHUNK_SIZE = 1 << 16
+
+# Filename slug patterns
+_UNSAFE_CHARS_RE = re.compile(r'[^a-zA-Z0-9\s-]')
+_SEPARATORS_RE = re.compile(r'[\s-]+')
 
 def sanitize_filename(text):
     """Create a safe filename slug from the title text."""
     # Take first 50 chars, alphanumeric + dashes
-    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', text).strip().lower()
-    slug = re.sub(r'[\s-]+', '-', slug)
+    slug = _UNSAFE_CHARS_RE.sub('', text).strip().lower()
+    slug = _SEPARATORS_RE.sub('-', slug)
     return slug[:50]
 
+# Command-line clipboard readers, tried in order on non-Windows platforms
+CLIPBOARD_COMMANDS = {
+    "darwin": [["pbpaste"]],
+    "linux": [
+        ["wl-paste", "--no-newline"],
+        ["xclip", "-selection", "clipboard", "-o"],
+        ["xsel", "--clipboard", "--output"],
+    ],
+}
+
+def _read_clipboard_win32():
+    """Reads CF_UNICODETEXT straight from the Win32 clipboard."""
+    import ctypes
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    user32.GetClipboardData.restype = wintypes.HANDLE
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+
+    if not user32.OpenClipboard(None):
+        return None
+    try:
+        handle = user32.GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            return None
+        pointer = kernel32.GlobalLock(handle)
+        if not pointer:
+            return None
+        try:
+            return ctypes.wstring_at(pointer)
+        finally:
+            kernel32.GlobalUnlock(handle)
+    finally:
+        user32.CloseClipboard()
+
+def read_clipboard_native():
+    """
+    Reads clipboard text without starting a Tcl/Tk interpreter.
+    Returns None when no lightweight mechanism is available.
+    """
+    try:
+        import pyperclip
+        return pyperclip.paste()
+    except Exception:
+        pass
+
+    if sys.platform == "win32":
+        try:
+            return _read_clipboard_win32()
+        except Exception:
+            return None
+
+    for command in CLIPBOARD_COMMANDS.get(sys.platform, CLIPBOARD_COMMANDS["linux"]):
+        if shutil.which(command[0]) is None:
+            continue
+        try:
+            return subprocess.check_output(command, text=True, encoding="utf-8", stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return None
+
+def read_clipboard_tk():
+    """Fallback clipboard reader using a hidden Tk root window."""
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw() # Hide the main window
+    try:
+        return root.clipboard_get()
+    except tk.TclError:
+        print("[ERROR] Clipboard is empty or contains non-text data.")
+        return None
+    finally:
+        root.destroy()
+
 def ingest_from_clipboard():
     """Reads text from clipboard and saves to staging."""
     STAGING_DIR.mkdir(parents=True, exist_ok=True)
     
     try:
-        # Use tkinter to access clipboard
-        root = tk.Tk()
-        root.withdraw() # Hide the main window
-        try:
-            content = root.clipboard_get()
-        except tk.TclError:
-            print("[ERROR] Clipboard is empty or contains non-text data.")
-            root.destroy()
-            return
-        root.destroy()
+        content = read_clipboard_native()
+        if content is None:
+            content = read_clipboard_tk()
+            if content is None:
+                return
     except Exception as e:
         print(f"[ERROR] Failed to access clipboard: {e}")
         return
@@ -54,10 +135,12 @@ def ingest_from_clipboard():
     file_path = STAGING_DIR / filename
     
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Write in slices so only one chunk is encoded at a time
+        with open(file_path, "w", encoding="utf-8", buffering=WRITE_CHUNK_SIZE) as f:
+            for i in range(0, len(content), WRITE_CHUNK_SIZE):
+                f.write(content[i:i + WRITE_CHUNK_SIZE])
         print(f"[SUCCESS] Ingested to staging: {filename}")
-        print(f"          Size: {len(content)} characters")
+        print(f"          Size: {file_path.stat().st_size} bytes")
     except Exception as e:
         print(f"[ERROR] Failed to write file: {e}")
 
@@ -1,17 +1,64 @@
 import os
 import csv
 import json
+import mmap
+import hashlib
 import argparse
 import re
+import shutil
+import contextlib
+import functools
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 ROOT_DIR = Path.cwd()
 STAGING_DIR = ROOT_DIR / "notebooklm-import-raw"
 ARCHIVE_DIR = ROOT_DIR / "knowledge-archive"
 TAXONOMY_DIR = ARCHIVE_DIR / "taxonomy"
 MANIFEST_FILE = ROOT_DIR / "classification-manifest.csv"
+MANIFEST_FIELDNAMES = ("original_path", "filename", "suggested_domain", "suggested_tags",
+                       "maturation_stage", "validation_status", "instructional_readiness",
+                       "experience_date", "provenance", "source_url", "related_links", "snippet", "status")
+CACHE_DIR = ROOT_DIR / ".cache"
+SNIPPET_CACHE_FILE = CACHE_DIR / "snippets.json"
+
+# Read windows for memory-mapped scans
+DOMAIN_WINDOW = 200
+COPY_CHUNK_SIZE = 1 << 20
+
+# Batches smaller than this are processed inline; the pool start-up would dominate
+PARALLEL_THRESHOLD = 32
+PARALLEL_CHUNKSIZE = 16
+# Reads kept in flight by the thread backend (slow network/FUSE storage)
+IO_THREADS = 64
+
+# Classification keywords -> heuristic group used by suggest_metadata
+METADATA_KEYWORDS = {
+    b"doctrine": "framework",
+    b"code": "technical",
+    b"function": "technical",
+    b"def ": "technical",
+    b"journal": "personal",
+    b"diary": "personal",
+    b"felt": "personal",
+}
+KEYWORD_GROUPS = frozenset(METADATA_KEYWORDS.values())
+_KEYWORD_RE = re.compile(b"|".join(re.escape(k) for k in METADATA_KEYWORDS), re.IGNORECASE)
+
+# Precompiled patterns for the per-file loops
+_DOMAIN_RE = re.compile(r'patterndomain:\s*(.+)')
+_SLUG_STRIP_RE = re.compile(r'[^a-z0-9-]')
+_WORD_RE = re.compile(rb'\S+')
+# Leading frontmatter block on raw bytes; markers may end in LF or CRLF
+_FRONTMATTER_BLOCK_RE = re.compile(rb'---\r?\n.*?\n---\r?\n', re.DOTALL)
 
 # Taxonomy Stubs (Placeholder defaults as actual JSONs were not provided)
 DEFAULT_DOMAINS = [
@@ -60,43 +107,202 @@ def initialize_directories():
         with open(tags_file, 'w') as f:
             json.dump(DEFAULT_TAGS, f, indent=2)
 
-def extract_snippet(content, word_count=75):
+def json_loads(data):
+    """Parses JSON bytes, through orjson when it is installed."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj):
+    """Serializes obj to compact UTF-8 JSON bytes, through orjson when it is installed."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
+@contextlib.contextmanager
+def map_file(file_path):
     """
-    Objective 4: Refine Indexing Logic
-    Extract the first 50-100 words of content, skipping YAML frontmatter.
+    Memory-maps a file read-only. Empty files yield b'' since mmap rejects them.
     """
-    # Remove YAML frontmatter if present (content between --- and --- at start)
-    content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
-    
-    # Basic cleanup of markdown symbols could be added here if needed
-    words = content.split()
-    snippet = ' '.join(words[:word_count])
-    return snippet
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def walk_files(directory, suffix="", skip_dirs=()):
+    """
+    Recursively yields os.DirEntry objects for files under directory.
+    scandir's cached entry types avoid the per-entry stat() that rglob pays;
+    directories named in skip_dirs are pruned before descent.
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs:
+                    yield from walk_files(entry.path, suffix, skip_dirs)
+            elif entry.name.endswith(suffix) and entry.is_file():
+                yield entry
+
+def frontmatter_end(buf):
+    """
+    Returns the byte offset just past a leading YAML frontmatter block, or 0.
+    """
+    if buf[:3] != b'---':
+        return 0
+    match = _FRONTMATTER_BLOCK_RE.match(buf)
+    return match.end() if match else 0
+
+def copy_buffer(buf, out, start=0):
+    """
+    Writes buf[start:] to out in fixed-size slices, so a large body is never
+    copied into a single bytes object.
+    """
+    for offset in range(start, len(buf), COPY_CHUNK_SIZE):
+        out.write(buf[offset:offset + COPY_CHUNK_SIZE])
+
+def yaml_list(items):
+    """
+    Renders a flow-style YAML list of double-quoted strings, e.g. ["a", "b"].
+    """
+    quoted = (item.replace('\\', '\\\\').replace('"', '\\"') for item in items)
+    return "[" + ", ".join(f'"{item}"' for item in quoted) + "]"
+
+def snippet_from_buffer(buf, word_count=75):
+    """
+    Builds a snippet from the first words after the frontmatter. Words are
+    matched directly in the byte buffer and the scan stops after word_count
+    matches, so only the snippet itself is ever decoded.
+    """
+    words = itertools.islice(_WORD_RE.finditer(buf, frontmatter_end(buf)), word_count)
+    return b' '.join(m.group() for m in words).decode('utf-8', errors='replace')
 
 def suggest_metadata(content, filename):
     """
     Objective 3: Heuristic for initial classification
     Suggest initial patterndomain, patterntags, and maturationstage based on content.
+    Content is a bytes-like buffer (e.g. an mmap); all keywords are located in a
+    single case-insensitive pass without lowering a copy of the document.
     """
-    lower_content = content.lower()
+    found = set()
+    for match in _KEYWORD_RE.finditer(content):
+        found.add(METADATA_KEYWORDS[match.group().lower()])
+        if len(found) == len(KEYWORD_GROUPS):
+            break
+
     domain = "social-engineering" # Default fallback
     tags = []
     stage = "experientialdata"
     
-    if "doctrine" in lower_content:
+    if "framework" in found:
         stage = "formalizedframework"
     
     # Simple heuristics based on keywords
-    if "code" in lower_content or "function" in lower_content or "def " in lower_content:
+    if "technical" in found:
         domain = "tradecraft"
         tags.append("code-snippet")
-    elif "journal" in lower_content or "diary" in lower_content or "felt" in lower_content:
+    elif "personal" in found:
         domain = "forensic-psychology"
         tags.append("reflection")
         
     return domain, ";".join(tags), stage
 
-def generate_manifest():
+def load_snippet_cache():
+    """
+    Loads the per-file analysis cache. A missing or unreadable cache is treated as empty.
+    """
+    if not SNIPPET_CACHE_FILE.exists():
+        return {}
+    try:
+        with open(SNIPPET_CACHE_FILE, 'rb') as f:
+            cache = json_loads(f.read())
+        return cache if isinstance(cache, dict) else {}
+    except Exception as e:
+        print(f"Ignoring unreadable cache {SNIPPET_CACHE_FILE}: {e}")
+        return {}
+
+def save_snippet_cache(cache):
+    """Persists the analysis cache; failures are reported but never fatal."""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        with open(SNIPPET_CACHE_FILE, 'wb') as f:
+            f.write(json_dumps(cache))
+    except Exception as e:
+        print(f"Could not write cache {SNIPPET_CACHE_FILE}: {e}")
+
+def cache_section(cache, name, width):
+    """
+    Returns one section of the analysis cache, keeping only well-formed
+    entries (lists of width fields); anything else is recomputed, not trusted.
+    """
+    section = cache.get(name)
+    if not isinstance(section, dict):
+        return {}
+    return {key: value for key, value in section.items() if isinstance(value, list) and len(value) == width}
+
+def cache_key(file_path):
+    """
+    Identifies a file version by path, modification time and size.
+    """
+    st = file_path.stat()
+    return hashlib.md5(f"{file_path}:{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()
+
+def analyze_staged_file(buf, file_path):
+    """
+    Returns [snippet, domain, tags, stage] for a staged markdown file.
+    """
+    snippet = snippet_from_buffer(buf)
+    domain, tags, stage = suggest_metadata(buf, file_path.name)
+    return [snippet, domain, tags, stage]
+
+def read_index_entry(buf, file_path):
+    """
+    Returns [domain, snippet] for an archived file; domain is None when the
+    file carries no patterndomain.
+    """
+    # Locate the domain key in the raw bytes and decode only a small window
+    pos = buf.find(b'patterndomain:')
+    if pos < 0:
+        return [None, ""]
+    window = buf[pos:pos + DOMAIN_WINDOW].decode('utf-8', errors='ignore')
+    match = _DOMAIN_RE.search(window)
+    if not match:
+        return [None, ""]
+    return [match.group(1).strip(), snippet_from_buffer(buf)]
+
+def _call_safely(func, file_path, use_mmap=True):
+    """
+    Calls func(buf, file_path). Mapped pages fault in while the GIL is held,
+    so thread workers use a plain read(), which releases it during the syscall.
+    """
+    try:
+        if use_mmap:
+            with map_file(file_path) as mm:
+                return func(mm, file_path)
+        with open(file_path, 'rb') as f:
+            return func(f.read(), file_path)
+    except Exception as e:
+        return e
+
+def map_files(func, paths, backend="process"):
+    """
+    Applies func to the contents of every path. The "process" backend fans
+    larger batches out across worker processes; the "thread" backend keeps up
+    to IO_THREADS reads in flight, which suits storage where latency rather
+    than CPU dominates. Returns {path: result}, where a failed call maps to
+    its exception.
+    """
+    if backend == "thread" and paths:
+        with ThreadPoolExecutor(max_workers=min(IO_THREADS, len(paths))) as ex:
+            results = ex.map(_call_safely, itertools.repeat(func), paths, itertools.repeat(False))
+            return dict(zip(paths, results))
+
+    if len(paths) < PARALLEL_THRESHOLD:
+        results = map(_call_safely, itertools.repeat(func), paths)
+        return dict(zip(paths, results))
+
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(_call_safely, itertools.repeat(func), paths, chunksize=PARALLEL_CHUNKSIZE)
+        return dict(zip(paths, results))
+
+def generate_manifest(backend="process"):
     """
     Objective 3: Phase 2 Initiation (Manifest Generation)
     Analyze files in staging and generate classification-manifest.csv.
@@ -106,52 +312,98 @@ def generate_manifest():
         return
 
     files_data = []
+    cache = load_snippet_cache()
+    cached = cache_section(cache, "manifest", 4)
+    fresh = {}
     
-    # Objective 2: Fix pathing logic to ensure it handles nested directories (rglob)
-    for file_path in STAGING_DIR.rglob("*.md"):
+    today = datetime.date.today().isoformat()
+    
+    # Objective 2: Fix pathing logic to ensure it handles nested directories (recursive scandir)
+    entries = []
+    for entry in walk_files(STAGING_DIR, ".md"):
+        file_path = Path(entry.path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            snippet = extract_snippet(content)
-            domain, tags, stage = suggest_metadata(content, file_path.name)
+            entries.append((file_path, cache_key(file_path)))
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+
+    # Only cache misses are analyzed; the pool fans them out across cores
+    computed = map_files(analyze_staged_file, [fp for fp, key in entries if key not in cached], backend)
+
+    for file_path, key in entries:
+        try:
+            result = cached.get(key) or computed[file_path]
+            if isinstance(result, Exception):
+                raise result
+            fresh[key] = result
+            snippet, domain, tags, stage = result
             
-            files_data.append({
-                "original_path": str(file_path.relative_to(ROOT_DIR)),
-                "filename": file_path.name,
-                "suggested_domain": domain,
-                "suggested_tags": tags,
-                "maturation_stage": stage,
-                "validation_status": "singleobservation",
-                "instructional_readiness": "internalreference",
-                "experience_date": datetime.date.today().isoformat(),
-                "provenance": "personaldocumentation",
-                "source_url": "",
-                "related_links": "",
-                "snippet": snippet,
-                "status": "pending"
-            })
+            # Row order follows MANIFEST_FIELDNAMES
+            files_data.append((
+                str(file_path.relative_to(ROOT_DIR)),
+                file_path.name,
+                domain,
+                tags,
+                stage,
+                "singleobservation",
+                "internalreference",
+                today,
+                "personaldocumentation",
+                "",
+                "",
+                snippet,
+                "pending"
+            ))
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
 
-    with open(MANIFEST_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ["original_path", "filename", "suggested_domain", "suggested_tags", 
-                      "maturation_stage", "validation_status", "instructional_readiness",
-                      "experience_date", "provenance", "source_url", "related_links", "snippet", "status"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for data in files_data:
-            writer.writerow(data)
+    cache["manifest"] = fresh
+    save_snippet_cache(cache)
+
+    with open(MANIFEST_FILE, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(MANIFEST_FIELDNAMES)
+        writer.writerows(files_data)
             
     print(f"Manifest generated at {MANIFEST_FILE} with {len(files_data)} entries.")
     
     # Display first 5 for immediate feedback as requested
     print("\n--- First 5 Files Analysis ---")
     for i, data in enumerate(files_data[:5]):
-        print(f"{i+1}. {data['filename']}")
-        print(f"   Domain: {data['suggested_domain']}")
-        print(f"   Tags: {data['suggested_tags']}")
-        print(f"   Snippet: {data['snippet'][:100]}...")
+        _, filename, domain, tags, *_, snippet, _ = data
+        print(f"{i+1}. {filename}")
+        print(f"   Domain: {domain}")
+        print(f"   Tags: {tags}")
+        print(f"   Snippet: {snippet[:100]}...")
+
+def move_with_header(source_path, target_path, header):
+    """
+    Fast path for documents without frontmatter: renames the source into place
+    and splices the header in through a sibling temp file. Returns False when
+    the source has frontmatter to strip or cannot be renamed (e.g. another
+    filesystem), leaving the caller to rewrite it.
+    """
+    with open(source_path, 'rb') as f:
+        head = f.read(5)
+        if head.startswith(b'---\n') or head == b'---\r\n':
+            return False
+    try:
+        os.replace(source_path, target_path)
+    except OSError:
+        return False
+
+    tmp_path = target_path.with_name(target_path.name + ".tmp")
+    try:
+        with open(target_path, 'rb') as src, open(tmp_path, 'wb') as out:
+            out.write(header)
+            shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+        os.replace(tmp_path, target_path)
+    except Exception:
+        # Put the untouched original back so the row can be retried
+        tmp_path.unlink(missing_ok=True)
+        os.replace(target_path, source_path)
+        raise
+    return True
 
 def organize_archive():
     """
@@ -164,10 +416,6 @@ def organize_archive():
 
     print("Starting Phase 3: Organization...")
     
-    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
     # Maturation stage to folder mapping
     stage_map = {
         "experientialdata": "experiential_data",
@@ -176,36 +424,42 @@ def organize_archive():
     }
 
     success_count = 0
+    created_dirs = set()
     
-    for row in rows:
-        try:
-            source_path = ROOT_DIR / row["original_path"]
-            if not source_path.exists():
-                print(f"Skipping missing file: {row['original_path']}")
-                continue
-
-            # Extract metadata
-            domain = row.get("suggested_domain", "mixed-pattern")
-            stage = row.get("maturation_stage", "experientialdata")
-            tags = [t.strip() for t in row.get("suggested_tags", "").split(";") if t.strip()]
-            links = [l.strip() for l in row.get("related_links", "").split(";") if l.strip()]
+    # Rows are processed as the reader yields them; the manifest is never held in memory
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                source_path = ROOT_DIR / row["original_path"]
+                if not source_path.exists():
+                    print(f"Skipping missing file: {row['original_path']}")
+                    continue
+
+                # Extract metadata
+                domain = row.get("suggested_domain", "mixed-pattern")
+                stage = row.get("maturation_stage", "experientialdata")
+                tags = [t.strip() for t in row.get("suggested_tags", "").split(";") if t.strip()]
+                links = [l.strip() for l in row.get("related_links", "").split(";") if l.strip()]
             
-            # Determine target directory
-            stage_folder = stage_map.get(stage, "experiential_data")
-            target_dir = ARCHIVE_DIR / domain / stage_folder
-            target_dir.mkdir(parents=True, exist_ok=True)
-
-            # Generate new filename: domain-slug-date.md
-            slug = re.sub(r'[^a-z0-9-]', '', row["filename"].lower().replace('.md', '').replace(' ', '-'))
-            import_date = datetime.date.today().isoformat()
-            new_filename = f"{domain}-{slug}-{import_date}.md"
-            target_path = target_dir / new_filename
-
-            # Prepare YAML Frontmatter
-            frontmatter = f"""---
+                # Determine target directory
+                stage_folder = stage_map.get(stage, "experiential_data")
+                target_dir = ARCHIVE_DIR / domain / stage_folder
+                if target_dir not in created_dirs:
+                    target_dir.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(target_dir)
+
+                # Generate new filename: domain-slug-date.md
+                slug = _SLUG_STRIP_RE.sub('', row["filename"].lower().replace('.md', '').replace(' ', '-'))
+                import_date = datetime.date.today().isoformat()
+                new_filename = f"{domain}-{slug}-{import_date}.md"
+                target_path = target_dir / new_filename
+
+                # Prepare YAML Frontmatter
+                frontmatter = f"""---
 patterndomain: {domain}
 maturationstage: {stage}
-patterntags: {json.dumps(tags)}
+patterntags: {yaml_list(tags)}
 validationstatus: {row.get("validation_status", "singleobservation")}
 instructionalreadiness: {row.get("instructional_readiness", "internalreference")}
 temporal_context:
@@ -214,29 +468,48 @@ temporal_context:
 provenance: {row.get("provenance", "personaldocumentation")}
 source: "notebooklm"
 source_url: "{row.get("source_url", "")}"
-related_links: {json.dumps(links)}
+related_links: {yaml_list(links)}
 import_date: {import_date}
 ---
 
 """
-            # Read original content, strip existing frontmatter, and write new file
-            with open(source_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
-
-            with open(target_path, 'w', encoding='utf-8') as f:
-                f.write(frontmatter + content)
+                header = frontmatter.encode('utf-8')
+                if not move_with_header(source_path, target_path, header):
+                    # Map original content, skip existing frontmatter, and write new file
+                    with map_file(source_path) as mm, open(target_path, 'wb') as out:
+                        out.write(header)
+                        copy_buffer(mm, out, frontmatter_end(mm))
 
-            # Remove original file
-            os.remove(source_path)
-            success_count += 1
-            print(f"Moved: {row['filename']} -> {target_path.relative_to(ROOT_DIR)}")
+                    # Remove original file
+                    os.remove(source_path)
+                success_count += 1
+                print(f"Moved: {row['filename']} -> {target_path.relative_to(ROOT_DIR)}")
 
-        except Exception as e:
-            print(f"Error processing {row.get('filename', 'unknown')}: {e}")
+            except Exception as e:
+                print(f"Error processing {row.get('filename', 'unknown')}: {e}")
 
     print(f"Organization complete. {success_count} files processed.")
 
+@functools.lru_cache(maxsize=8)
+def _load_taxonomy(path_str, mtime_ns):
+    with open(path_str, 'rb') as f:
+        data = json_loads(f.read())
+    # Handle both list of strings and list of dicts with 'id'
+    if data and isinstance(data, list) and isinstance(data[0], dict):
+        return frozenset(item.get('id') for item in data)
+    elif isinstance(data, list):
+        return frozenset(data)
+    return frozenset()
+
+def load_taxonomy_ids(file_path):
+    """
+    Returns the ids defined in a taxonomy JSON file as a frozenset.
+    Parses are cached per (path, mtime), so an edited file is re-read.
+    """
+    if not file_path.exists():
+        return frozenset()
+    return _load_taxonomy(str(file_path), file_path.stat().st_mtime_ns)
+
 def validate_manifest():
     """
     Objective: Validate the manifest against taxonomy files.
@@ -249,32 +522,17 @@ def validate_manifest():
     domains_file = TAXONOMY_DIR / "domains.json"
     tags_file = TAXONOMY_DIR / "tags.json"
     
-    valid_domains = set()
-    valid_tags = set()
-
     try:
-        if domains_file.exists():
-            with open(domains_file, 'r') as f:
-                data = json.load(f)
-                # Handle both list of strings and list of dicts with 'id'
-                if data and isinstance(data, list) and len(data) > 0 and isinstance(data[0], dict):
-                    valid_domains = {item.get('id') for item in data}
-                elif isinstance(data, list):
-                    valid_domains = set(data)
-        
-        if tags_file.exists():
-            with open(tags_file, 'r') as f:
-                data = json.load(f)
-                if data and isinstance(data, list) and len(data) > 0 and isinstance(data[0], dict):
-                    valid_tags = {item.get('id') for item in data}
-                elif isinstance(data, list):
-                    valid_tags = set(data)
+        valid_domains = load_taxonomy_ids(domains_file)
+        valid_tags = load_taxonomy_ids(tags_file)
     except Exception as e:
         print(f"Error loading taxonomy: {e}")
         return
 
     print("Validating manifest against taxonomy...")
     issues = []
+    expected_domains = sorted(valid_domains)
+    expected_tags = sorted(valid_tags)
     
     with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
@@ -284,11 +542,11 @@ def validate_manifest():
             tags = [t.strip() for t in row.get('suggested_tags', '').split(';') if t.strip()]
             
             if domain and domain not in valid_domains:
-                issues.append(f"File '{filename}': Invalid domain '{domain}'. Expected one of {sorted(list(valid_domains))}")
+                issues.append(f"File '{filename}': Invalid domain '{domain}'. Expected one of {expected_domains}")
             
             for tag in tags:
                 if tag not in valid_tags:
-                    issues.append(f"File '{filename}': Invalid tag '{tag}'. Expected one of {sorted(list(valid_tags))}")
+                    issues.append(f"File '{filename}': Invalid tag '{tag}'. Expected one of {expected_tags}")
 
     if issues:
         print(f"Validation failed with {len(issues)} issues:")
@@ -299,7 +557,7 @@ def validate_manifest():
     else:
         print("Validation successful! Manifest is compliant with taxonomy.")
 
-def generate_indices():
+def generate_indices(backend="process"):
     """
     Objective 4: Indexing
     Generate markdown indices based on the organized archive.
@@ -310,30 +568,45 @@ def generate_indices():
     
     # Scan archive
     index_data = {} # domain -> list of files
+    cache = load_snippet_cache()
+    cached = cache_section(cache, "indices", 2)
+    fresh = {}
     
-    for file_path in ARCHIVE_DIR.rglob("*.md"):
-        if "taxonomy" in file_path.parts:
-            continue
-            
+    entries = []
+    archive_files = walk_files(ARCHIVE_DIR, ".md", skip_dirs=("taxonomy",)) if ARCHIVE_DIR.exists() else ()
+    for entry in archive_files:
+        file_path = Path(entry.path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Extract frontmatter domain using regex
-            match = re.search(r'patterndomain:\s*(.+)', content)
-            if match:
-                domain = match.group(1).strip()
-                if domain not in index_data:
-                    index_data[domain] = []
-                
-                index_data[domain].append({
-                    "filename": file_path.name,
-                    "path": str(file_path.relative_to(ROOT_DIR)).replace('\\', '/'),
-                    "snippet": extract_snippet(content)
-                })
+            entries.append((file_path, cache_key(file_path)))
         except Exception as e:
             print(f"Skipping {file_path.name}: {e}")
 
+    computed = map_files(read_index_entry, [fp for fp, key in entries if key not in cached], backend)
+
+    for file_path, key in entries:
+        try:
+            result = cached.get(key) or computed[file_path]
+            if isinstance(result, Exception):
+                raise result
+            fresh[key] = result
+            domain, snippet = result
+            if not domain:
+                continue
+
+            if domain not in index_data:
+                index_data[domain] = []
+
+            index_data[domain].append({
+                "filename": file_path.name,
+                "path": str(file_path.relative_to(ROOT_DIR)).replace('\\', '/'),
+                "snippet": snippet
+            })
+        except Exception as e:
+            print(f"Skipping {file_path.name}: {e}")
+
+    cache["indices"] = fresh
+    save_snippet_cache(cache)
+
     # Write Index Files
     for domain, files in index_data.items():
         index_file = indices_dir / f"{domain}-index.md"
@@ -361,15 +634,15 @@ def generate_report():
         "stages": {}
     }
 
-    for file_path in ARCHIVE_DIR.rglob("*.md"):
-        if "taxonomy" in file_path.parts or file_path.name.lower() == "readme.md":
+    for entry in walk_files(ARCHIVE_DIR, ".md", skip_dirs=("taxonomy",)):
+        if entry.name.lower() == "readme.md":
             continue
             
         stats["total_files"] += 1
         
         try:
             # Structure: ARCHIVE_DIR / domain / stage / file
-            rel_parts = file_path.relative_to(ARCHIVE_DIR).parts
+            rel_parts = os.path.relpath(entry.path, ARCHIVE_DIR).split(os.sep)
             if len(rel_parts) >= 2:
                 domain = rel_parts[0]
                 stage = rel_parts[1]
@@ -394,18 +667,20 @@ def generate_report():
 def main():
     parser = argparse.ArgumentParser(description="Knowledge Archive Migration Toolkit")
     parser.add_argument("command", choices=["init", "run", "validate", "index", "report"], help="Command to execute")
+    parser.add_argument("--backend", choices=["process", "thread"], default="process",
+                        help="How file reads are parallelized; 'thread' overlaps I/O on network or FUSE storage")
     
     args = parser.parse_args()
     
     if args.command == "init":
         initialize_directories()
-        generate_manifest()
+        generate_manifest(args.backend)
     elif args.command == "validate":
         validate_manifest()
     elif args.command == "run":
         organize_archive()
     elif args.command == "index":
-        generate_indices()
+        generate_indices(args.backend)
     elif args.command == "report":
         generate_report()
 
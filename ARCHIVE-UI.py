@@ -2,8 +2,15 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import subprocess
 import threading
+import itertools
+import collections
+import selectors
+import locale
+import mmap
+import time
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import re
 
@@ -14,11 +21,157 @@ EXPORT_SCRIPT = "ARCHIVE-EXPORT.py"
 INGEST_SCRIPT = "ARCHIVE-INGEST.py"
 MANIFEST_FILE = "classification-manifest.csv"
 
+# Searches over fewer files than this run inline; the pool start-up would dominate
+PARALLEL_THRESHOLD = 32
+PARALLEL_CHUNKSIZE = 16
+
+# Child output is read in large chunks and handed to the log at most this often
+READ_CHUNK_SIZE = 1 << 16
+LOG_FLUSH_INTERVAL = 0.05
+
+# Frontmatter block and its "key: value" lines, matched directly against memory-mapped bytes
+_FM_BLOCK_RE = re.compile(rb'\A---\r?\n(.*?)\r?\n---', re.DOTALL)
+_FM_KV_RE = re.compile(rb'^[ \t]*([\w-]+)[ \t]*:[ \t]*(.*?)[ \t]*\r?$', re.MULTILINE)
+
+# Brackets and quotes dropped from a patterntags value before splitting
+_TAG_STRIP = str.maketrans('', '', '[]"\'')
+
+def parse_frontmatter(data):
+    """
+    Parses the leading frontmatter block of a document given as bytes.
+    Returns (meta, body_offset): a flat {key: value} dict and the offset where
+    the body starts, so callers can slice data[body_offset:] without splitting.
+    Kept in step with directive/archive_toolkit.py, so a note parses the same
+    in the dashboard and the toolkit.
+    """
+    match = _FM_BLOCK_RE.match(data)
+    if not match:
+        return {}, 0
+    meta = {k.decode('utf-8'): v.decode('utf-8') for k, v in _FM_KV_RE.findall(match.group(1))}
+    return meta, match.end()
+
+def parse_tag_list(tags_str):
+    """
+    Splits a patterntags value into tags. Accepts both JSON-style lists and
+    bare comma-separated strings, e.g. '["a", "b"]' or 'a, b'.
+    """
+    return [t.strip() for t in tags_str.translate(_TAG_STRIP).split(',') if t.strip()]
+
+def iter_archive_markdown(root):
+    """Yields the path of every .md file under root, pruning taxonomy/ before descent."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "taxonomy"]
+        for name in filenames:
+            if name.endswith(".md"):
+                yield os.path.join(dirpath, name)
+
+def scan_archive_file(file_path, domain_query, tag_query):
+    """
+    Returns (filename, domain, tags, path) when the file's frontmatter matches
+    both queries, otherwise None. Runs in worker processes, so it must stay at
+    module level.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                meta, body_offset = parse_frontmatter(mm)
+        # Notes without a frontmatter block are not searchable
+        if not body_offset:
+            return None
+
+        domain = meta.get("patterndomain") or "unknown"
+        tags_str = meta.get("patterntags") or "[]"
+        tags_clean = tags_str.translate(_TAG_STRIP)
+        tags_list = [t.lower() for t in parse_tag_list(tags_str)]
+
+        match_domain = not domain_query or domain_query in domain.lower()
+        match_tag = not tag_query or any(tag_query in t for t in tags_list)
+
+        if match_domain and match_tag:
+            return (os.path.basename(file_path), domain, tags_clean, str(file_path))
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+    return None
+
+class LogBatcher:
+    """
+    Splits raw child-process output into lines and passes them to the Tk
+    thread in batches, at most once per LOG_FLUSH_INTERVAL, rather than
+    queueing one Tk event per line. feed() may be called from several threads.
+    """
+    def __init__(self, root, log, encoding):
+        self.root = root
+        self.log = log
+        self.encoding = encoding
+        self.partial = {}
+        self.pending = []
+        self.last_flush = 0.0
+        self.lock = threading.Lock()
+
+    def feed(self, stream_id, data, prefix=""):
+        """Adds a chunk read from stream_id; an empty chunk marks end of stream."""
+        with self.lock:
+            chunks = self.partial.setdefault(stream_id, [])
+            if data and b"\n" not in data:
+                chunks.append(data)
+                return
+            buf = b"".join(chunks) + data
+            chunks.clear()
+            if data:
+                lines = buf.split(b"\n")
+                chunks.append(lines.pop())
+            else:
+                lines = [buf] if buf else []
+            self.pending.extend(prefix + line.decode(self.encoding, errors='replace').rstrip() for line in lines)
+        self.flush()
+
+    def flush(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if self.pending and (force or now - self.last_flush >= LOG_FLUSH_INTERVAL):
+                self.root.after(0, self.log, "\n".join(self.pending))
+                self.pending = []
+                self.last_flush = now
+
+def pump_selector(process, batcher):
+    """Drains stdout and stderr together with select(), so neither pipe can fill up and stall the child."""
+    with selectors.DefaultSelector() as sel:
+        sel.register(process.stdout, selectors.EVENT_READ, "")
+        sel.register(process.stderr, selectors.EVENT_READ, "[ERROR] ")
+        while sel.get_map():
+            for key, _ in sel.select(timeout=0.1):
+                data = os.read(key.fd, READ_CHUNK_SIZE)
+                if not data:
+                    sel.unregister(key.fileobj)
+                batcher.feed(key.fd, data, key.data)
+            batcher.flush()
+
+def pump_threads(process, batcher):
+    """Windows pipes cannot be polled with select(), so each stream gets a reader thread."""
+    def pump(stream, prefix):
+        for data in iter(lambda: stream.read1(READ_CHUNK_SIZE), b""):
+            batcher.feed(stream.fileno(), data, prefix)
+        batcher.feed(stream.fileno(), b"", prefix)
+
+    readers = [threading.Thread(target=pump, args=(process.stdout, ""), daemon=True),
+               threading.Thread(target=pump, args=(process.stderr, "[ERROR] "), daemon=True)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        while reader.is_alive():
+            reader.join(LOG_FLUSH_INTERVAL)
+            batcher.flush()
+
 class ArchiveDashboard:
     def __init__(self, root):
         self.root = root
         self.root.title("Knowledge Archive Controller")
         self.root.geometry("900x650")
+        self.log_buffer = collections.deque()
+        self.log_flush_pending = False
+        self.search_id = 0
         
         # Configure Styles
         self.style = ttk.Style()
@@ -100,14 +253,26 @@ class ArchiveDashboard:
         btn.pack(fill=tk.X, pady=3)
         
     def log(self, message):
+        """Queues a message; queued lines reach the widget in one insert per LOG_FLUSH_INTERVAL."""
+        self.log_buffer.append(message)
+        if not self.log_flush_pending:
+            self.log_flush_pending = True
+            self.root.after(int(LOG_FLUSH_INTERVAL * 1000), self.flush_log)
+
+    def flush_log(self):
+        self.log_flush_pending = False
+        lines = []
+        while self.log_buffer:
+            lines.append(self.log_buffer.popleft())
+        if not lines:
+            return
         self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + "\n")
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
         self.log_text.see(tk.END)
         self.log_text.config(state='disabled')
 
     def run_process(self, command):
         self.status_var.set(f"Executing: {' '.join(command)}...")
-        self.root.update_idletasks()
         
         def target():
             try:
@@ -121,23 +286,20 @@ class ArchiveDashboard:
                     command,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    text=True,
+                    bufsize=READ_CHUNK_SIZE,
                     cwd=os.getcwd(),
                     startupinfo=startupinfo
                 )
                 
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        self.root.after(0, self.log, output.strip())
-                
-                stderr = process.stderr.read()
-                if stderr:
-                    self.root.after(0, self.log, f"[ERROR] {stderr.strip()}")
+                # Decode as text=True would have: the child writes in the locale encoding
+                batcher = LogBatcher(self.root, self.log, locale.getpreferredencoding(False))
+                if sys.platform == 'win32':
+                    pump_threads(process, batcher)
+                else:
+                    pump_selector(process, batcher)
+                batcher.flush(force=True)
                 
-                rc = process.poll()
+                rc = process.wait()
                 status_msg = "Operation Complete" if rc == 0 else f"Failed with code {rc}"
                 self.root.after(0, self.status_var.set, status_msg)
                 
@@ -155,14 +317,29 @@ class ArchiveDashboard:
         self.log(f"\n>>> python {script_name} {' '.join(args)}")
         self.run_process(["python", script_name] + args)
 
+    def open_file(self, path, on_success=None, on_error=None):
+        """
+        Opens path with its associated application on a daemon thread, since
+        ShellExecute can stall the event loop. Callbacks run on the Tk thread.
+        """
+        def target():
+            try:
+                os.startfile(path)
+            except Exception as e:
+                if on_error:
+                    self.root.after(0, on_error, e)
+                return
+            if on_success:
+                self.root.after(0, on_success)
+
+        threading.Thread(target=target, daemon=True).start()
+
     def open_manifest(self):
         manifest_path = Path(MANIFEST_FILE)
         if manifest_path.exists():
-            try:
-                os.startfile(manifest_path)
-                self.log(f"[INFO] Opened {manifest_path}")
-            except Exception as e:
-                self.log(f"[ERROR] Could not open file: {e}")
+            self.open_file(manifest_path,
+                           on_success=lambda: self.log(f"[INFO] Opened {manifest_path}"),
+                           on_error=lambda e: self.log(f"[ERROR] Could not open file: {e}"))
         else:
             self.log(f"[WARN] Manifest {MANIFEST_FILE} not found. Run 'Initialize' first.")
 
@@ -222,41 +399,42 @@ class ArchiveDashboard:
             messagebox.showerror("Error", "Archive directory not found.")
             return
 
-        count = 0
+        # Results from an older search still in flight are dropped on arrival
+        self.search_id += 1
+        self.search_count = 0
         self.status_var.set("Searching...")
-        self.root.update_idletasks()
-
-        for file_path in archive_path.rglob("*.md"):
-             if "taxonomy" in file_path.parts: continue
-             
-             try:
-                 with open(file_path, 'r', encoding='utf-8') as f:
-                     content = f.read()
-                 
-                 frontmatter_match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-                 if not frontmatter_match: continue
-                 
-                 fm_text = frontmatter_match.group(1)
-                 
-                 domain_match = re.search(r'patterndomain:\s*(.+)', fm_text)
-                 domain = domain_match.group(1).strip() if domain_match else "unknown"
-                 
-                 tags_match = re.search(r'patterntags:\s*(.+)', fm_text)
-                 tags_str = tags_match.group(1).strip() if tags_match else "[]"
-                 tags_clean = tags_str.replace('[', '').replace(']', '').replace('"', '').replace("'", "")
-                 tags_list = [t.strip().lower() for t in tags_clean.split(',') if t.strip()]
-                 
-                 match_domain = not domain_query or domain_query in domain.lower()
-                 match_tag = not tag_query or any(tag_query in t for t in tags_list)
-                 
-                 if match_domain and match_tag:
-                     self.results_tree.insert("", tk.END, values=(file_path.name, domain, tags_clean, str(file_path)))
-                     count += 1
-                     
-             except Exception as e:
-                 print(f"Error reading {file_path}: {e}")
-        
-        self.status_var.set(f"Search complete. Found {count} files.")
+
+        search_id = self.search_id
+
+        def target():
+            paths = list(iter_archive_markdown(archive_path))
+            queries = (itertools.repeat(domain_query), itertools.repeat(tag_query))
+            try:
+                if len(paths) < PARALLEL_THRESHOLD:
+                    for row in map(scan_archive_file, paths, *queries):
+                        if row:
+                            self.root.after(0, self.insert_result, search_id, row)
+                else:
+                    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                        for row in ex.map(scan_archive_file, paths, *queries, chunksize=PARALLEL_CHUNKSIZE):
+                            if row:
+                                self.root.after(0, self.insert_result, search_id, row)
+            except Exception as e:
+                self.root.after(0, self.status_var.set, f"Search failed: {e}")
+                return
+            self.root.after(0, self.finish_search, search_id)
+
+        threading.Thread(target=target, daemon=True).start()
+
+    def insert_result(self, search_id, row):
+        if search_id != self.search_id:
+            return
+        self.results_tree.insert("", tk.END, values=row)
+        self.search_count += 1
+
+    def finish_search(self, search_id):
+        if search_id == self.search_id:
+            self.status_var.set(f"Search complete. Found {self.search_count} files.")
 
     def on_result_double_click(self, event):
         selection = self.results_tree.selection()
@@ -264,10 +442,7 @@ class ArchiveDashboard:
         item = selection[0]
         values = self.results_tree.item(item, "values")
         file_path = values[3]
-        try:
-            os.startfile(file_path)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not open file: {e}")
+        self.open_file(file_path, on_error=lambda e: messagebox.showerror("Error", f"Could not open file: {e}"))
 
     def setup_help_tab(self):
         self.help_text = scrolledtext.ScrolledText(self.help_tab, state='disabled', font=("Consolas", 10), padx=10, pady=10)
@@ -3,6 +3,10 @@ import csv
 import json
 import argparse
 import re
+import mmap
+import shutil
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -13,6 +17,45 @@ ARCHIVE_DIR = ROOT_DIR / "archive"
 TAXONOMY_DIR = ROOT_DIR / "taxonomy"
 MANIFEST_DIR = ROOT_DIR / "manifests"
 MANIFEST_FILE = MANIFEST_DIR / "classification-manifest.csv"
+ARCHIVE_CACHE_FILE = MANIFEST_DIR / ".archive_cache.json"
+ORGANIZED_CACHE_FILE = MANIFEST_DIR / ".organized.json"
+MANIFEST_FIELDNAMES = ("filepath", "filename", "pattern_domain", "pattern_tags", "maturation_stage", "snippet")
+
+# Archive files read concurrently on a cold scan; overlaps open/read latency
+READ_CONCURRENCY = 64
+
+# Cold batches this large are parsed across worker processes instead of threads
+PARALLEL_THRESHOLD = 32
+PARALLEL_CHUNKSIZE = 64
+
+# Buffer size for copying document bodies
+COPY_CHUNK_SIZE = 1 << 20
+
+# Bytes read per staged file; comfortably more than a 75-word snippet
+SNIPPET_READ_SIZE = 8192
+
+# Frontmatter block and its "key: value" lines, matched on raw bytes
+_FM_BLOCK_RE = re.compile(rb'\A---\r?\n(.*?)\r?\n---', re.DOTALL)
+_FM_KV_RE = re.compile(rb'^[ \t]*([\w-]+)[ \t]*:[ \t]*(.*?)[ \t]*\r?$', re.MULTILINE)
+
+# Snippet tokenization
+_LEADING_WS_RE = re.compile(r'\s*')
+_WORD_RE = re.compile(r'\S+')
+
+# Markdown links [text](path) in generated indexes; link text may itself contain brackets
+_LINK_RE = re.compile(rb'\[.*?\]\((.*?)\)')
+
+# Brackets and quotes dropped from a patterntags value before splitting
+_TAG_STRIP = str.maketrans('', '', '[]"\'')
+
+# Maturation stage (lowercased, separators removed) -> archive folder
+STAGE_MAP = {
+    "experientialdata": "experiential_data",
+    "analyticalsynthesis": "analytical_synthesis",
+    "formalizedframework": "formalized_frameworks",
+    "raw": "experiential_data"
+}
+_STAGE_TRANS = str.maketrans('', '', ' -_')
 
 # --- Taxonomy Stubs ---
 DEFAULT_DOMAINS = [
@@ -29,6 +72,10 @@ DEFAULT_TAGS = [
     {"id": "c-ptsd", "description": "Complex Post-Traumatic Stress Disorder"}
 ]
 
+# Serialized once at import; init writes these verbatim
+_DEFAULT_DOMAINS_JSON = json.dumps(DEFAULT_DOMAINS, indent=2)
+_DEFAULT_TAGS_JSON = json.dumps(DEFAULT_TAGS, indent=2)
+
 def init_directories():
     """Initialize the directory skeleton and taxonomy stubs."""
     dirs = [STAGING_DIR, ARCHIVE_DIR, TAXONOMY_DIR, MANIFEST_DIR]
@@ -39,41 +86,175 @@ def init_directories():
     # Populate Taxonomy Stubs
     domains_file = TAXONOMY_DIR / "domains.json"
     if not domains_file.exists():
-        with open(domains_file, 'w', encoding='utf-8') as f:
-            json.dump(DEFAULT_DOMAINS, f, indent=2)
+        domains_file.write_text(_DEFAULT_DOMAINS_JSON, encoding='utf-8')
         print(f"[INFO] Created taxonomy stub: {domains_file}")
 
     tags_file = TAXONOMY_DIR / "tags.json"
     if not tags_file.exists():
-        with open(tags_file, 'w', encoding='utf-8') as f:
-            json.dump(DEFAULT_TAGS, f, indent=2)
+        tags_file.write_text(_DEFAULT_TAGS_JSON, encoding='utf-8')
         print(f"[INFO] Created taxonomy stub: {tags_file}")
 
 def extract_snippet(text, word_count=75):
     """
     Extracts the first 50-100 words of content.
     Skips potential frontmatter (content between --- and --- at start).
+    Words are matched lazily, so only the start of the text is scanned.
     """
-    # Normalize newlines
-    text = text.strip()
-    
-    # Simple frontmatter skip if present
-    if text.startswith("---"):
+    # Skip leading whitespace and a frontmatter block, if present
+    pos = _LEADING_WS_RE.match(text).end()
+    if text.startswith("---", pos):
+        end = text.find("---", pos + 3)
+        if end >= 0:
+            pos = end + 3
+
+    words = []
+    for match in _WORD_RE.finditer(text, pos):
+        # Drop heavy markdown header markers for cleaner text
+        word = match.group().rstrip('#')
+        if not word:
+            continue
+        if len(words) == word_count:
+            return " ".join(words) + "..."
+        words.append(word)
+    return " ".join(words)
+
+def parse_frontmatter(data):
+    """
+    Parses the leading frontmatter block of a document given as bytes.
+    Returns (meta, body_offset): a flat {key: value} dict and the offset where
+    the body starts, so callers can slice data[body_offset:] without splitting.
+    """
+    match = _FM_BLOCK_RE.match(data)
+    if not match:
+        return {}, 0
+    meta = {k.decode('utf-8'): v.decode('utf-8') for k, v in _FM_KV_RE.findall(match.group(1))}
+    return meta, match.end()
+
+def parse_tag_list(tags_str):
+    """
+    Splits a patterntags value into tags. Accepts both JSON-style lists and
+    bare comma-separated strings, e.g. '["a", "b"]' or 'a, b'.
+    """
+    return [t.strip() for t in tags_str.translate(_TAG_STRIP).split(',') if t.strip()]
+
+def _iter_files(root):
+    """
+    Recursively yields os.DirEntry objects for files under root, in the same
+    order as os.walk, without the extra stat() calls os.walk makes.
+    """
+    subdirs = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+    for path in subdirs:
+        yield from _iter_files(path)
+
+def _load_cache(path):
+    """Loads a JSON cache file; a missing or unreadable cache is treated as empty."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(path, cache):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"[WARN] Could not write cache {path}: {e}")
+
+def _parse_one(path):
+    """
+    Reads and parses one archive file, returning (meta, snippet) or the
+    exception raised. Runs in worker threads or processes, so it stays at
+    module level.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        meta, body_offset = parse_frontmatter(data)
+        # Files organized by this toolkit carry a precomputed snippet; older ones fall back to the body
+        stored = meta.pop("snippet", None)
+        if stored is not None:
+            try:
+                return meta, json.loads(stored)
+            except ValueError:
+                pass
+        return meta, extract_snippet(data[body_offset:].decode('utf-8'))
+    except Exception as e:
+        return e
+
+def _scan_archive(use_cache=True):
+    """
+    Returns one {"path", "name", "meta", "snippet"} record per archived .md file.
+    Parsed frontmatter and snippets are cached in manifests/.archive_cache.json,
+    keyed by path and checked against (mtime_ns, size), so only new or changed
+    files are reopened. Those are parsed on a thread pool, keeping up to
+    READ_CONCURRENCY reads in flight, or across worker processes for batches
+    of PARALLEL_THRESHOLD files or more.
+    """
+    cache = _load_cache(ARCHIVE_CACHE_FILE) if use_cache else {}
+    fresh = {}
+    files = []
+    stale = []
+
+    archive_files = _iter_files(ARCHIVE_DIR) if ARCHIVE_DIR.exists() else ()
+    for entry in archive_files:
+        if not entry.name.endswith(".md"):
+            continue
         try:
-            _, _, content = text.split("---", 2)
-            text = content.strip()
-        except ValueError:
-            pass # Malformed or not frontmatter
+            rel_path = os.path.relpath(entry.path, ROOT_DIR).replace(os.sep, '/')
+            st = entry.stat()
+        except Exception as e:
+            print(f"[WARN] Skipping {entry.name}: {e}")
+            continue
+        files.append((entry, rel_path))
+        cached = cache.get(rel_path)
+        if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            fresh[rel_path] = cached
+        else:
+            stale.append((entry, rel_path, st))
 
-    # Remove heavy markdown headers for cleaner text
-    text = re.sub(r'#+\s', '', text)
-    
-    words = text.split()
-    snippet = " ".join(words[:word_count])
-    if len(words) > word_count:
-        snippet += "..."
-    
-    return snippet
+    if stale:
+        # Large cold batches are CPU-bound on parsing; small ones are dominated by I/O latency
+        if len(stale) >= PARALLEL_THRESHOLD:
+            executor, chunksize = ProcessPoolExecutor(), PARALLEL_CHUNKSIZE
+        else:
+            executor, chunksize = ThreadPoolExecutor(max_workers=min(READ_CONCURRENCY, len(stale))), 1
+        with executor as ex:
+            results = ex.map(_parse_one, [item[0].path for item in stale], chunksize=chunksize)
+            for (entry, rel_path, st), result in zip(stale, results):
+                if isinstance(result, Exception):
+                    print(f"[WARN] Skipping {entry.name}: {result}")
+                    continue
+                meta, snippet = result
+                fresh[rel_path] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "meta": meta,
+                    "snippet": snippet
+                }
+
+    docs = []
+    for entry, rel_path in files:
+        record = fresh.get(rel_path)
+        if record:
+            docs.append({
+                "path": rel_path,
+                "name": os.path.splitext(entry.name)[0],
+                "meta": record["meta"],
+                "snippet": record["snippet"]
+            })
+
+    if use_cache:
+        _save_cache(ARCHIVE_CACHE_FILE, fresh)
+    return docs
 
 def generate_manifest():
     """Scans staging directory and generates the classification manifest."""
@@ -81,46 +262,59 @@ def generate_manifest():
         print(f"[WARN] Staging directory {STAGING_DIR} does not exist. Please create it and add raw files.")
         return
 
-    records = []
+    count = 0
     print(f"[INFO] Scanning {STAGING_DIR}...")
 
-    # Walk through staging directory to handle nested folders
-    for root, _, files in os.walk(STAGING_DIR):
-        for file in files:
+    # Rows are written as files are scanned; the manifest is never held in memory
+    with open(MANIFEST_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(MANIFEST_FIELDNAMES)
+
+        # Walk through staging directory to handle nested folders
+        for entry in _iter_files(STAGING_DIR):
+            file = entry.name
             if file.endswith(".txt") or file.endswith(".md"):
-                file_path = Path(root) / file
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
+                    # Only the head of the file is needed for the snippet
+                    with open(entry.path, 'rb') as f:
+                        head = f.read(SNIPPET_READ_SIZE)
                     
-                    snippet = extract_snippet(content)
+                    snippet = extract_snippet(head.decode('utf-8', errors='ignore'))
                     
-                    # Relative path for the manifest
-                    rel_path = file_path.relative_to(STAGING_DIR)
-
-                    records.append({
-                        "filepath": str(rel_path),
-                        "filename": file,
-                        "pattern_domain": "", # To be filled by human
-                        "pattern_tags": "",   # To be filled by human
-                        "maturation_stage": "raw",
-                        "snippet": snippet
-                    })
+                    # Row order follows MANIFEST_FIELDNAMES; domain and tags are filled by a human
+                    writer.writerow((os.path.relpath(entry.path, STAGING_DIR), file, "", "", "raw", snippet))
+                    count += 1
                 except Exception as e:
                     print(f"[ERROR] Could not process {file}: {e}")
-
-    # Write Manifest
-    with open(MANIFEST_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ["filepath", "filename", "pattern_domain", "pattern_tags", "maturation_stage", "snippet"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(records)
     
-    print(f"[SUCCESS] Manifest generated at {MANIFEST_FILE} with {len(records)} entries.")
+    print(f"[SUCCESS] Manifest generated at {MANIFEST_FILE} with {count} entries.")
+
+def _append_file(f_in, f_out):
+    """
+    Appends the rest of f_in to f_out. On Linux the copy stays in the kernel
+    via copy_file_range; elsewhere, or if the filesystem refuses it before any
+    data has moved, it falls back to a buffered copyfileobj.
+    """
+    f_out.flush()
+    if hasattr(os, "copy_file_range"):
+        copied = 0
+        try:
+            while True:
+                n = os.copy_file_range(f_in.fileno(), f_out.fileno(), COPY_CHUNK_SIZE)
+                if n == 0:
+                    return
+                copied += n
+        except OSError:
+            if copied:
+                raise
+    shutil.copyfileobj(f_in, f_out, COPY_CHUNK_SIZE)
 
 def organize_archive():
     """
     Phase 3: Reads manifest, moves files to architecture, injects frontmatter.
+    Rows whose manifest entry and source file (mtime, size) are unchanged
+    since the last run, and whose destination still exists, are skipped;
+    that state is kept in manifests/.organized.json.
     """
     if not MANIFEST_FILE.exists():
         # Fallback: Check root directory if not found in manifests/
@@ -135,86 +329,122 @@ def organize_archive():
         manifest_path = MANIFEST_FILE
 
     print(f"[INFO] Processing manifest: {manifest_path}")
+    today = datetime.now().strftime('%Y-%m-%d')
+    organized = _load_cache(ORGANIZED_CACHE_FILE)
+    unchanged = 0
+    # Per-row paths are plain strings; Path objects are reserved for the fixed roots
+    staging_root, archive_root, root = str(STAGING_DIR), str(ARCHIVE_DIR), str(ROOT_DIR)
     
     with open(manifest_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+        # Rows are read positionally; columns are located once from the header
+        reader = csv.reader(f)
+        header = next(reader, [])
+        idx = {name: i for i, name in enumerate(header)}
+        missing = [name for name in ("filepath", "filename", "pattern_domain", "maturation_stage") if name not in idx]
+        if missing:
+            print(f"[ERROR] Manifest {manifest_path} is missing columns: {', '.join(missing)}")
+            return
+        i_path, i_name, i_domain, i_stage = idx["filepath"], idx["filename"], idx["pattern_domain"], idx["maturation_stage"]
+        i_tags = idx.get("pattern_tags")
+
         for row in reader:
+            if not row:
+                continue
+            if len(row) < len(header):
+                row += [""] * (len(header) - len(row))
+
             # Skip if domain is empty (user hasn't classified)
-            if not row.get('pattern_domain'):
-                print(f"[SKIP] No domain set for {row['filename']}")
+            if not row[i_domain]:
+                print(f"[SKIP] No domain set for {row[i_name]}")
                 continue
 
             # Source path
-            src_path = STAGING_DIR / row['filepath']
-            if not src_path.exists():
+            src_path = os.path.join(staging_root, row[i_path])
+            try:
+                src_stat = os.stat(src_path)
+            except OSError:
                 print(f"[WARN] Source file not found: {src_path}")
                 continue
 
             # Determine Destination
-            domain = row['pattern_domain'].strip().lower().replace(" ", "-")
-            raw_stage = row['maturation_stage'].strip()
-            clean_stage = raw_stage.lower().replace(" ", "").replace("-", "")
+            domain = row[i_domain].strip().lower().replace(" ", "-")
+            raw_stage = row[i_stage].strip()
+            clean_stage = raw_stage.lower().translate(_STAGE_TRANS)
             
             # Map stage to folder
-            stage_map = {
-                "experientialdata": "experiential_data",
-                "analyticalsynthesis": "analytical_synthesis",
-                "formalizedframework": "formalized_frameworks",
-                "raw": "experiential_data"
-            }
-            stage_folder = stage_map.get(clean_stage, "experiential_data")
+            stage_folder = STAGE_MAP.get(clean_stage, "experiential_data")
             
-            dest_dir = ARCHIVE_DIR / domain / stage_folder
-            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest_dir = os.path.join(archive_root, domain, stage_folder)
+            os.makedirs(dest_dir, exist_ok=True)
             
             # Clean filename
-            dest_filename = row['filename']
+            dest_filename = row[i_name]
             if not dest_filename.endswith(".md"):
-                dest_filename = Path(dest_filename).stem + ".md"
+                dest_filename = os.path.splitext(os.path.basename(dest_filename))[0] + ".md"
             
-            dest_path = dest_dir / dest_filename
-
-            # Read Content
-            try:
-                with open(src_path, 'r', encoding='utf-8', errors='ignore') as f_in:
-                    content = f_in.read()
-            except Exception as e:
-                print(f"[ERROR] Reading {src_path}: {e}")
+            dest_path = os.path.join(dest_dir, dest_filename)
+
+            # Skip rows already organized from this exact source and manifest entry
+            state = {
+                "row": row,
+                "src_mtime_ns": src_stat.st_mtime_ns,
+                "src_size": src_stat.st_size,
+                "dest": os.path.relpath(dest_path, root)
+            }
+            if organized.get(row[i_path]) == state and os.path.exists(dest_path):
+                unchanged += 1
                 continue
 
             # Prepare Frontmatter
-            tags = row.get('pattern_tags', '[]')
+            tags = row[i_tags] if i_tags is not None else '[]'
             if tags and not tags.startswith('['):
                 tags = json.dumps([t.strip() for t in tags.split(',') if t.strip()])
             elif not tags:
                 tags = "[]"
 
-            frontmatter = [
-                "---",
-                f"patterndomain: {domain}",
-                f"maturationstage: {raw_stage}",
-                f"patterntags: {tags}",
-                "validationstatus: singleobservation",
-                "instructionalreadiness: internalreference",
-                "temporal_context:",
-                "  experience_date: ''",
-                f"  analysis_date: {datetime.now().strftime('%Y-%m-%d')}",
-                "provenance: personaldocumentation",
-                "source: notebooklm",
-                f"import_date: {datetime.now().strftime('%Y-%m-%d')}",
-                "---",
-                "",
-                content
-            ]
+            # Open Source; its content is copied as raw bytes, and only the head is decoded for the snippet
+            try:
+                f_in = open(src_path, 'rb')
+                head = f_in.read(SNIPPET_READ_SIZE)
+            except Exception as e:
+                print(f"[ERROR] Reading {src_path}: {e}")
+                continue
+            snippet = extract_snippet(head.decode('utf-8', errors='ignore'))
+
+            frontmatter = f"""---
+patterndomain: {domain}
+maturationstage: {raw_stage}
+patterntags: {tags}
+validationstatus: singleobservation
+instructionalreadiness: internalreference
+temporal_context:
+  experience_date: ''
+  analysis_date: {today}
+provenance: personaldocumentation
+source: notebooklm
+import_date: {today}
+snippet: {json.dumps(snippet)}
+---
+
+"""
 
             # Write File
             try:
-                with open(dest_path, 'w', encoding='utf-8') as f_out:
-                    f_out.write("\n".join(frontmatter))
-                print(f"[MOVE] {src_path.name} -> {dest_path}")
+                with f_in, open(dest_path, 'wb') as f_out:
+                    f_out.write(frontmatter.encode('utf-8'))
+                    f_out.write(head)
+                    # Realign the descriptor with the bytes consumed so far before the kernel copy
+                    f_in.seek(len(head))
+                    _append_file(f_in, f_out)
+                organized[row[i_path]] = state
+                print(f"[MOVE] {os.path.basename(src_path)} -> {dest_path}")
             except Exception as e:
                 print(f"[ERROR] Writing {dest_path}: {e}")
 
+    _save_cache(ORGANIZED_CACHE_FILE, organized)
+    if unchanged:
+        print(f"[INFO] Skipped {unchanged} unchanged files.")
+
 def generate_indexes():
     """
     Phase 4: Generates markdown indexes in _indexes/ based on metadata.
@@ -222,106 +452,85 @@ def generate_indexes():
     index_dir = ROOT_DIR / "_indexes"
     index_dir.mkdir(exist_ok=True)
     
-    docs = []
     print(f"[INFO] Scanning archive for indexing...")
-    
-    for p in ARCHIVE_DIR.rglob('*.md'):
-        try:
-            with open(p, 'r', encoding='utf-8') as f:
-                text = f.read()
-            
-            # Extract Frontmatter
-            meta = {}
-            if text.startswith("---"):
-                parts = text.split("---", 2)
-                if len(parts) >= 3:
-                    fm_lines = parts[1].strip().split('\n')
-                    for line in fm_lines:
-                        if ':' in line:
-                            k, v = line.split(':', 1)
-                            meta[k.strip()] = v.strip()
-                    content = parts[2]
-                else:
-                    content = text
-            else:
-                content = text
-
-            snippet = extract_snippet(content)
-            
-            docs.append({
-                "path": p.relative_to(ROOT_DIR).as_posix(),
-                "name": p.stem,
-                "meta": meta,
-                "snippet": snippet
-            })
-        except Exception as e:
-            print(f"[WARN] Skipping {p.name}: {e}")
+    docs = _scan_archive()
 
     def write_index(filename, title, key):
         out_path = index_dir / filename
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(f"# {title}\n\n")
-            groups = {}
-            for d in docs:
-                val = d['meta'].get(key, "Uncategorized")
-                groups.setdefault(val, []).append(d)
-            
-            for group, items in sorted(groups.items()):
-                f.write(f"## {group}\n\n")
-                for item in items:
-                    f.write(f"### [{item['name']}](../{item['path']})\n")
-                    f.write(f"> {item['snippet']}\n\n")
-                    f.write(f"- **Domain:** `{item['meta'].get('patterndomain', 'N/A')}`\n")
-                    f.write(f"- **Stage:** `{item['meta'].get('maturationstage', 'N/A')}`\n\n")
+        groups = {}
+        for d in docs:
+            val = d['meta'].get(key, "Uncategorized")
+            groups.setdefault(val, []).append(d)
+
+        # Assemble the whole index in memory and write it in one call
+        buf = [f"# {title}\n\n"]
+        for group, items in sorted(groups.items()):
+            buf.append(f"## {group}\n\n")
+            buf.extend(
+                f"### [{item['name']}](../{item['path']})\n"
+                f"> {item['snippet']}\n\n"
+                f"- **Domain:** `{item['meta'].get('patterndomain', 'N/A')}`\n"
+                f"- **Stage:** `{item['meta'].get('maturationstage', 'N/A')}`\n\n"
+                for item in items
+            )
+        out_path.write_text("".join(buf), encoding='utf-8')
         print(f"[INDEX] Generated {out_path}")
 
     write_index("index-maturation.md", "Index by Maturation Stage", "maturationstage")
     write_index("index-domains.md", "Index by Pattern Domain", "patterndomain")
     write_index("index-validation.md", "Index by Validation Status", "validationstatus")
 
-def validate_archive():
+def validate_archive(resolve_symlinks=False):
     """
     Phase 5: Validation.
     Checks for broken links in indexes and verifies file integrity.
+    Paths are compared lexically (abspath) unless resolve_symlinks is set,
+    which follows symlinks with realpath at the cost of extra syscalls.
     """
+    canonical = os.path.realpath if resolve_symlinks else os.path.abspath
     index_dir = ROOT_DIR / "_indexes"
     if not index_dir.exists():
         print(f"[ERROR] Index directory not found: {index_dir}")
         return
 
     print("[INFO] Validating indexes...")
+    index_root = str(index_dir)
     
     issues = []
     indexed_files = set()
     
     # Check links in indexes
-    for index_file in index_dir.glob("*.md"):
-        print(f"[CHECK] Scanning {index_file.name}...")
+    with os.scandir(index_dir) as it:
+        index_files = [(entry.name, entry.path) for entry in it if entry.name.endswith(".md")]
+    for index_name, index_file in index_files:
+        print(f"[CHECK] Scanning {index_name}...")
         try:
-            with open(index_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Regex to find markdown links: [text](path)
-            links = re.findall(r'\[.*?\]\((.*?)\)', content)
+            with open(index_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                # Scan the mapped bytes; only the link targets are decoded
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    links = [m.group(1).decode('utf-8') for m in _LINK_RE.finditer(mm)]
             
             for link in links:
                 # Links in indexes are usually relative like ../archive/domain/stage/file.md
                 # Resolve relative to the index file
-                target_path = (index_dir / link).resolve()
+                target_path = canonical(os.path.join(index_root, link))
                 
-                if not target_path.exists():
-                    issues.append(f"[BROKEN LINK] In {index_file.name}: {link} -> {target_path} does not exist.")
+                if not os.path.exists(target_path):
+                    issues.append(f"[BROKEN LINK] In {index_name}: {link} -> {target_path} does not exist.")
                 else:
                     indexed_files.add(target_path)
 
         except Exception as e:
-            issues.append(f"[ERROR] Could not read {index_file.name}: {e}")
+            issues.append(f"[ERROR] Could not read {index_name}: {e}")
 
     # Check for orphans (files in archive not referenced in any index)
     print("[CHECK] Scanning for orphaned files...")
-    for f in ARCHIVE_DIR.rglob("*.md"):
-        if f.resolve() not in indexed_files:
-            issues.append(f"[ORPHAN] File exists but not indexed: {f.relative_to(ROOT_DIR)}")
+    archive_files = _iter_files(ARCHIVE_DIR) if ARCHIVE_DIR.exists() else ()
+    for entry in archive_files:
+        if entry.name.endswith(".md") and canonical(entry.path) not in indexed_files:
+            issues.append(f"[ORPHAN] File exists but not indexed: {os.path.relpath(entry.path, ROOT_DIR)}")
 
     # Report
     if issues:
@@ -344,46 +553,17 @@ def report_statistics():
     
     stats = {
         "total_files": 0,
-        "by_domain": {},
-        "by_stage": {},
-        "by_tag": {}
+        "by_domain": Counter(),
+        "by_stage": Counter(),
+        "by_tag": Counter()
     }
 
-    for p in ARCHIVE_DIR.rglob('*.md'):
+    for doc in _scan_archive():
         stats["total_files"] += 1
-        try:
-            with open(p, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract simple frontmatter
-            domain = "unknown"
-            stage = "unknown"
-            tags = []
-            
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 2:
-                    fm = parts[1]
-                    for line in fm.split('\n'):
-                        line = line.strip()
-                        if line.startswith("patterndomain:"):
-                            domain = line.split(":", 1)[1].strip()
-                        elif line.startswith("maturationstage:"):
-                            stage = line.split(":", 1)[1].strip()
-                        elif line.startswith("patterntags:"):
-                            tag_str = line.split(":", 1)[1].strip()
-                            try:
-                                tags = json.loads(tag_str)
-                            except:
-                                pass
-
-            stats["by_domain"][domain] = stats["by_domain"].get(domain, 0) + 1
-            stats["by_stage"][stage] = stats["by_stage"].get(stage, 0) + 1
-            for tag in tags:
-                stats["by_tag"][tag] = stats["by_tag"].get(tag, 0) + 1
-
-        except Exception as e:
-            print(f"[WARN] Error reading {p.name}: {e}")
+        meta = doc["meta"]
+        stats["by_domain"][meta.get("patterndomain", "unknown")] += 1
+        stats["by_stage"][meta.get("maturationstage", "unknown")] += 1
+        stats["by_tag"].update(parse_tag_list(meta.get("patterntags", "")))
 
     print("\n=== Archive Migration Report ===")
     print(f"Total Files: {stats['total_files']}")
@@ -405,6 +585,7 @@ def report_statistics():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Knowledge Archive Migration Toolkit")
     parser.add_argument("command", choices=["init", "run", "index", "validate", "report"], help="Command to execute")
+    parser.add_argument("--resolve-symlinks", action="store_true", help="validate: follow symlinks when matching index links to archive files")
     args = parser.parse_args()
 
     if args.command == "init":
@@ -416,6 +597,6 @@ if __name__ == "__main__":
     elif args.command == "index":
         generate_indexes()
     elif args.command == "validate":
-        validate_archive()
+        validate_archive(args.resolve_symlinks)
     elif args.command == "report":
         report_statistics()
\ No newline at end of file
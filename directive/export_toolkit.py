@@ -1,142 +1,527 @@
 import os
+import re
+import sys
 import json
+import mmap
+import tarfile
 import zipfile
+import contextlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 ROOT_DIR = Path(os.getcwd())
 ARCHIVE_DIR = ROOT_DIR / "archive"
 INDEX_DIR = ROOT_DIR / "_indexes"
+OUTPUT_NDJSON = ROOT_DIR / "knowledge_bundle.ndjson"
 OUTPUT_JSON = ROOT_DIR / "knowledge_bundle.json"
 OUTPUT_ZIP = ROOT_DIR / "knowledge_archive.zip"
+OUTPUT_TAR_ZST = ROOT_DIR / "knowledge_archive.tar.zst"
+BUNDLE_CACHE_FILE = ROOT_DIR / ".bundle_cache.json"
+
+# Walked paths all start with the root directory; relative paths are a slice past it
+ROOT_PREFIX_LEN = len(os.path.join(str(ROOT_DIR), ""))
+
+# Output buffer for the JSON bundle writer
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Archives with at least this many files are parsed across worker processes
+PARALLEL_THRESHOLD = 32
+PARALLEL_CHUNKSIZE = 32
+
+# Files parsed per batch; one batch is parsed ahead while the previous one is written
+BATCH_SIZE = 256
+
+# Zip method and default level per --compressor choice (None is the codec's default)
+ZIP_METHODS = {
+    "stored": (zipfile.ZIP_STORED, None),
+    "deflate": (zipfile.ZIP_DEFLATED, None),
+    "fast": (zipfile.ZIP_DEFLATED, 1),
+    "bzip2": (zipfile.ZIP_BZIP2, None),
+    "lzma": (zipfile.ZIP_LZMA, None)
+}
+ZSTD_LEVEL = 3
+
+# Accepted --level range per compressor; stored and lzma take no level
+COMPRESSION_LEVELS = {
+    "deflate": (0, 9),
+    "fast": (0, 9),
+    "bzip2": (1, 9),
+    "zstd": (1, 22)
+}
+
+# Zip members up to this size are read whole and added with writestr
+ZIP_INLINE_LIMIT = 1 << 20
+
+# Bundle bytes read per step when verifying
+READ_CHUNK_SIZE = 1 << 16
+
+# Whitespace between JSON tokens
+_JSON_WS_RE = re.compile(r'[ \t\n\r]*')
+
+# Frontmatter "key: value" lines
+_FM_KV_RE = re.compile(r'^([^:\n]*):(.*)$', re.MULTILINE)
+
+def decode_text(data):
+    """
+    Decodes UTF-8 bytes (or any buffer, without copying it first) and
+    normalizes line endings the way a text-mode read would.
+    """
+    text = str(data, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def parse_frontmatter(buf):
+    """
+    Splits a raw document (bytes or a memory map) into (meta, body). The
+    frontmatter is the text between the leading '---' and the next '---';
+    both markers are found with a C-level find on the undecoded buffer, and
+    only the two regions either side are decoded. Values are kept as strings,
+    except bracketed values that parse as JSON lists. Without a complete
+    frontmatter block, meta is empty and the content is returned unchanged.
+    """
+    end = buf.find(b'---', 3) if buf[:3] == b'---' else -1
+    with memoryview(buf) as view:
+        if end < 0:
+            return {}, decode_text(view)
+        # Slices are released explicitly too, so the map can close even if decoding fails
+        with view[3:end] as fm, view[end + 3:] as rest:
+            fm_text = decode_text(fm)
+            body = decode_text(rest).strip()
 
-def bundle_to_json():
-    """Bundles all markdown files in the archive into a single JSON file."""
+    meta = {}
+    for k, v in _FM_KV_RE.findall(fm_text):
+        val = v.strip()
+        # Try to parse JSON lists in frontmatter
+        if val[:1] == '[' and val[-1:] == ']':
+            try:
+                val = json_loads(val)
+            except ValueError:
+                pass
+        # Keys repeat across every document; share one string object per key
+        meta[sys.intern(k.strip())] = val
+    return meta, body
+
+def json_loads(data):
+    """Parses a JSON str or bytes value, through orjson when it is installed."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_bytes(obj):
+    """
+    Serializes obj to compact UTF-8 JSON bytes (non-ASCII kept as-is), through
+    orjson when it is installed and the stdlib encoder otherwise.
+    """
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _walk_files(root, suffix=""):
+    """
+    Yields the path of every file under root whose name ends with suffix.
+    Uses scandir's cached entry types, so no per-file stat() is made.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    yield entry.path
+
+def _posix_rel_path(path):
+    """Root-relative, '/'-separated form of a path from _walk_files."""
+    rel = path[ROOT_PREFIX_LEN:]
+    return rel if os.sep == '/' else rel.replace(os.sep, '/')
+
+def read_document(path):
+    """
+    Parses a file's frontmatter and body straight from a read-only memory
+    map, so the raw bytes are never copied before decoding.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse_frontmatter(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return parse_frontmatter(mm)
+
+def _process_md(path):
+    """
+    Reads and parses one archive file into its bundle entry, or returns the
+    exception raised. Runs in worker processes, so it stays at module level.
+    """
+    try:
+        meta, body = read_document(path)
+
+        return {
+            "filename": os.path.basename(path),
+            "path": _posix_rel_path(path),
+            "metadata": meta,
+            "content": body
+        }
+    except Exception as e:
+        return e
+
+def _load_bundle_cache(bundle_path):
+    """
+    Returns the per-file records of the previous bundle, or {} when there is
+    no cache or bundle_path is no longer the bundle it describes.
+    """
+    try:
+        with open(BUNDLE_CACHE_FILE, 'rb') as f:
+            cache = json_loads(f.read())
+        if cache.get("bundle") != bundle_path.name or bundle_path.stat().st_size != cache.get("bundle_size"):
+            return {}
+        return cache.get("files", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def bundle_to_json(full=False, legacy_array=False):
+    """
+    Bundles all markdown files in the archive into newline-delimited JSON,
+    one entry per line, or into a single JSON array with legacy_array set.
+    Entries are serialized and written one at a time, so memory stays bounded
+    by the largest single file rather than the whole archive. Archives of
+    PARALLEL_THRESHOLD files or more are parsed across worker processes, in
+    batches of BATCH_SIZE so only two batches of results are in flight.
+
+    Each entry's (mtime_ns, size) and byte range are cached in
+    .bundle_cache.json; unchanged files are not re-parsed, their entry is
+    copied from the previous bundle instead.
+    """
     if not ARCHIVE_DIR.exists():
         print(f"[ERROR] Archive directory not found: {ARCHIVE_DIR}")
         return
 
-    print(f"[INFO] Bundling archive to {OUTPUT_JSON}...")
-    bundle = []
+    bundle_path = OUTPUT_JSON if legacy_array else OUTPUT_NDJSON
+    print(f"[INFO] Bundling archive to {bundle_path}...")
+    cache = {} if full else _load_bundle_cache(bundle_path)
+    files = {}
+    count = 0
+    reused = 0
 
-    for p in ARCHIVE_DIR.rglob('*.md'):
+    scanned = []
+    stale = []
+    for path in _walk_files(ARCHIVE_DIR, ".md"):
+        rel_path = _posix_rel_path(path)
         try:
-            with open(p, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Parse Frontmatter
-            meta = {}
-            body = content
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    fm_lines = parts[1].strip().split('\n')
-                    for line in fm_lines:
-                        if ':' in line:
-                            k, v = line.split(':', 1)
-                            val = v.strip()
-                            # Try to parse JSON lists in frontmatter
-                            if val.startswith('[') and val.endswith(']'):
-                                try:
-                                    val = json.loads(val)
-                                except:
-                                    pass
-                            meta[k.strip()] = val
-                    body = parts[2].strip()
-
-            entry = {
-                "filename": p.name,
-                "path": p.relative_to(ROOT_DIR).as_posix(),
-                "metadata": meta,
-                "content": body
-            }
-            bundle.append(entry)
-        except Exception as e:
-            print(f"[WARN] Failed to process {p.name}: {e}")
-
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(bundle, f, indent=2)
+            st = os.stat(path)
+        except OSError as e:
+            print(f"[WARN] Failed to process {os.path.basename(path)}: {e}")
+            continue
+        cached = cache.get(rel_path)
+        if not (cached and (cached["mtime_ns"], cached["size"]) == (st.st_mtime_ns, st.st_size)):
+            cached = None
+            stale.append(path)
+        scanned.append((path, rel_path, st, cached))
+
+    # Written beside the target first: unchanged entries are copied from the current bundle
+    tmp_file = bundle_path.with_name(bundle_path.name + ".tmp")
+    lead, sep, trail = (b'[\n', b',\n', b'\n]\n') if legacy_array else (b'', b'\n', b'\n')
+    with contextlib.ExitStack() as stack:
+        old = stack.enter_context(open(bundle_path, 'rb')) if cache else None
+        out = stack.enter_context(open(tmp_file, 'wb', buffering=WRITE_BUFFER_SIZE))
+        ex = stack.enter_context(ProcessPoolExecutor()) if len(stale) >= PARALLEL_THRESHOLD else None
+
+        def parse_batch(batch):
+            paths = [path for path, _, _, cached in batch if not cached]
+            if ex:
+                return ex.map(_process_md, paths, chunksize=PARALLEL_CHUNKSIZE)
+            return map(_process_md, paths)
+
+        batches = [scanned[i:i + BATCH_SIZE] for i in range(0, len(scanned), BATCH_SIZE)]
+        pending = parse_batch(batches[0]) if batches else None
+
+        out.write(lead)
+        offset = len(lead)
+        for n, batch in enumerate(batches):
+            entries = pending
+            if n + 1 < len(batches):
+                pending = parse_batch(batches[n + 1])
+            for path, rel_path, st, cached in batch:
+                data = None
+                if cached:
+                    old.seek(cached["offset"])
+                    data = old.read(cached["length"])
+                    if data.startswith(b'{') and data.endswith(b'}'):
+                        reused += 1
+                    else:
+                        data = None
+                        entry = _process_md(path)
+                else:
+                    entry = next(entries)
+
+                if data is None:
+                    if isinstance(entry, Exception):
+                        print(f"[WARN] Failed to process {os.path.basename(path)}: {entry}")
+                        continue
+                    data = json_bytes(entry)
+
+                if count:
+                    out.write(sep)
+                    offset += len(sep)
+                out.write(data)
+                files[rel_path] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "offset": offset,
+                    "length": len(data)
+                }
+                offset += len(data)
+                count += 1
+        if count or legacy_array:
+            out.write(trail)
+
+    os.replace(tmp_file, bundle_path)
+    with open(BUNDLE_CACHE_FILE, 'wb') as f:
+        f.write(json_bytes({"bundle": bundle_path.name, "bundle_size": bundle_path.stat().st_size, "files": files}))
     
-    print(f"[SUCCESS] Bundled {len(bundle)} files into JSON.")
+    print(f"[SUCCESS] Bundled {count} files into JSON ({reused} unchanged).")
 
-def create_zip_archive():
-    """Zips the archive and indexes directories."""
+def _list_export_files():
+    """
+    Returns (file_path, arcname, size) for every file in the archive and
+    indexes directories, smallest first. Collecting and stat-ing everything up front
+    keeps directory syscalls out of the compression loop.
+    """
+    # Add Archive
+    paths = list(_walk_files(ARCHIVE_DIR))
+
+    # Add Indexes
+    if INDEX_DIR.exists():
+        paths.extend(_walk_files(INDEX_DIR))
+
+    files = []
+    for file_path in paths:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        files.append((size, file_path))
+    files.sort(key=lambda t: t[0])
+    return [(file_path, file_path[ROOT_PREFIX_LEN:], size) for size, file_path in files]
+
+def create_zip_archive(compressor="deflate", level=None):
+    """
+    Zips the archive and indexes directories.
+    compressor is one of ZIP_METHODS: "deflate" (zlib default level), "fast"
+    (deflate level 1, several times faster for a slightly larger file),
+    "stored", "bzip2" or "lzma" (smallest, slowest; suited to cold storage).
+    "zstd" writes a .tar.zst instead when the zstandard package is installed.
+    level overrides the codec's compression level where it has one, and must
+    lie in its COMPRESSION_LEVELS range. The archive is written beside the
+    target and only renamed into place once it is complete.
+    """
     if not ARCHIVE_DIR.exists():
         print(f"[ERROR] Archive directory not found.")
         return
 
+    if compressor == "zstd" and not zstandard:
+        print("[WARN] zstandard is not installed; using fast deflate instead.")
+        compressor = "fast"
+
+    if level is not None:
+        if compressor not in COMPRESSION_LEVELS:
+            print(f"[ERROR] The {compressor} compressor does not take a level.")
+            return
+        low, high = COMPRESSION_LEVELS[compressor]
+        if not low <= level <= high:
+            print(f"[ERROR] Level {level} is out of range for {compressor} ({low}-{high}).")
+            return
+
+    if compressor == "zstd":
+        create_tar_zst_archive(ZSTD_LEVEL if level is None else level)
+        return
+
+    method, default_level = ZIP_METHODS[compressor]
     print(f"[INFO] Creating zip archive at {OUTPUT_ZIP}...")
     
-    with zipfile.ZipFile(OUTPUT_ZIP, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # Add Archive
-        for root, _, files in os.walk(ARCHIVE_DIR):
-            for file in files:
-                file_path = Path(root) / file
-                arcname = file_path.relative_to(ROOT_DIR)
-                zf.write(file_path, arcname)
-        
-        # Add Indexes
-        if INDEX_DIR.exists():
-            for root, _, files in os.walk(INDEX_DIR):
-                for file in files:
-                    file_path = Path(root) / file
-                    arcname = file_path.relative_to(ROOT_DIR)
+    tmp_file = OUTPUT_ZIP.with_name(OUTPUT_ZIP.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp_file, 'w', method, compresslevel=default_level if level is None else level) as zf:
+            for file_path, arcname, size in _list_export_files():
+                if size > ZIP_INLINE_LIMIT:
                     zf.write(file_path, arcname)
+                    continue
+                # Small files: one read and one compress call instead of chunked streaming
+                zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                zf.writestr(zinfo, data, compress_type=zf.compression, compresslevel=zf.compresslevel)
+        os.replace(tmp_file, OUTPUT_ZIP)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     print(f"[SUCCESS] Archive zipped successfully.")
 
-def verify_bundle():
-    """Verifies the integrity of the generated JSON bundle."""
-    if not OUTPUT_JSON.exists():
-        print(f"[ERROR] Bundle file not found: {OUTPUT_JSON}")
-        return
+def create_tar_zst_archive(level=ZSTD_LEVEL):
+    """Streams the archive and indexes directories into a zstd-compressed tarball."""
+    print(f"[INFO] Creating zstd archive at {OUTPUT_TAR_ZST}...")
+
+    tmp_file = OUTPUT_TAR_ZST.with_name(OUTPUT_TAR_ZST.name + ".tmp")
+    try:
+        with open(tmp_file, 'wb') as raw, \
+                zstandard.ZstdCompressor(level=level, threads=-1).stream_writer(raw) as zf, \
+                tarfile.open(fileobj=zf, mode='w|') as tar:
+            for file_path, arcname, _ in _list_export_files():
+                tar.add(file_path, arcname, recursive=False)
+        os.replace(tmp_file, OUTPUT_TAR_ZST)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    print(f"[SUCCESS] Archive compressed successfully.")
+
+def iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yields the elements of the top-level JSON array in text file f one at a
+    time, decoding each as soon as it has been read, so the document is never
+    held in memory as a whole. Raises ValueError on malformed input, including
+    anything but whitespace after the closing bracket.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    state = "open"
+    while True:
+        pos = _JSON_WS_RE.match(buf, pos).end()
+        if pos < len(buf):
+            c = buf[pos]
+            if state == "end":
+                raise ValueError(f"Unexpected data after bundle array, found {c!r}")
+            if state == "open":
+                if c != '[':
+                    raise ValueError("Bundle is not a JSON array")
+                state, pos = "first", pos + 1
+                continue
+            if c == ']' and state in ("first", "sep"):
+                state, pos = "end", pos + 1
+                continue
+            if state == "sep":
+                if c != ',':
+                    raise ValueError(f"Expected ',' or ']' in bundle, found {c!r}")
+                state, pos = "item", pos + 1
+                continue
 
-    print(f"[INFO] Verifying {OUTPUT_JSON}...")
+            # An element may run past the end of the buffer (a number can even decode
+            # short); only trust it once a delimiter after it has been read
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+            if end is not None and (eof or (end < len(buf) and buf[end] in ' \t\n\r,]')):
+                yield item
+                state, pos = "sep", end
+                continue
+        elif eof:
+            if state == "end":
+                return
+            raise ValueError("Unexpected end of bundle")
+
+        # Grow reads with the pending buffer so one large element is not re-scanned per chunk
+        chunk = f.read(max(chunk_size, len(buf) - pos))
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+def iter_ndjson(f):
+    """Yields the entry decoded from each non-blank line of text file f."""
+    for line in f:
+        if line.strip():
+            yield json_loads(line)
+
+def verify_bundle(legacy_array=False, fail_fast=False):
+    """
+    Verifies the integrity of the generated bundle (the JSON array variant
+    with legacy_array set). Entries are streamed from the file one at a time
+    rather than loaded as a whole; with fail_fast, reading stops at the first
+    entry that has issues. Returns True if the bundle is valid.
+    """
+    bundle_path = OUTPUT_JSON if legacy_array else OUTPUT_NDJSON
+    if not bundle_path.exists():
+        print(f"[ERROR] Bundle file not found: {bundle_path}")
+        return False
+
+    print(f"[INFO] Verifying {bundle_path}...")
     try:
-        with open(OUTPUT_JSON, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         issues = []
-        for i, entry in enumerate(data):
-            fname = entry.get("filename", f"Entry {i}")
-            meta = entry.get("metadata", {})
+        count = 0
+        with open(bundle_path, 'r', encoding='utf-8') as f:
+            entries = iter_json_array(f) if legacy_array else iter_ndjson(f)
+            for i, entry in enumerate(entries):
+                count += 1
+                get = entry.get("metadata", {}).get
+                domain_ok = get("patterndomain")
+                stage_ok = get("maturationstage")
+                tags = get("patterntags")
+                tags_ok = tags is None or isinstance(tags, list)
+                # Most entries pass; the name is only looked up for reporting
+                if domain_ok and stage_ok and tags_ok:
+                    continue
+
+                fname = entry.get("filename", f"Entry {i}")
             
-            # Critical fields check
-            if not meta.get("patterndomain"):
-                issues.append(f"[MISSING] {fname}: patterndomain")
-            if not meta.get("maturationstage"):
-                issues.append(f"[MISSING] {fname}: maturationstage")
+                # Critical fields check
+                if not domain_ok:
+                    issues.append(f"[MISSING] {fname}: patterndomain")
+                if not stage_ok:
+                    issues.append(f"[MISSING] {fname}: maturationstage")
             
-            # Type check tags (should be a list if parsed correctly)
-            tags = meta.get("patterntags")
-            if tags is not None and not isinstance(tags, list):
-                 issues.append(f"[TYPE] {fname}: patterntags is {type(tags)}, expected list")
+                # Type check tags (should be a list if parsed correctly)
+                if not tags_ok:
+                     issues.append(f"[TYPE] {fname}: patterntags is {type(tags)}, expected list")
+
+                if fail_fast:
+                    break
 
         if issues:
-            print(f"[WARN] Found {len(issues)} issues:")
+            if fail_fast:
+                print(f"[WARN] Stopped at the first invalid entry (entry {count}):")
+            else:
+                print(f"[WARN] Found {len(issues)} issues:")
             for issue in issues:
                 print(issue)
-        else:
-            print(f"[SUCCESS] Verified {len(data)} entries. Metadata structure looks correct.")
+            return False
+
+        print(f"[SUCCESS] Verified {count} entries. Metadata structure looks correct.")
+        return True
 
     except Exception as e:
         print(f"[ERROR] Verification failed: {e}")
+        return False
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Knowledge Archive Export Toolkit")
-    parser.add_argument("--json", action="store_true", help="Export to JSON bundle")
+    parser.add_argument("--json", action="store_true", help="Export to JSON bundle (newline-delimited)")
     parser.add_argument("--zip", action="store_true", help="Export to ZIP archive")
     parser.add_argument("--verify", action="store_true", help="Verify the generated JSON bundle")
     parser.add_argument("--all", action="store_true", help="Export both")
+    parser.add_argument("--compressor", choices=[*ZIP_METHODS, "zstd"], default="deflate", help="Compression for --zip: a zip method (fast is level-1 deflate) or a zstd .tar.zst")
+    parser.add_argument("--level", type=int, help="Compression level for --zip, overriding the compressor's default (deflate and fast 0-9, bzip2 1-9, zstd 1-22)")
+    parser.add_argument("--legacy-array", action="store_true", help="Write and verify the bundle as a single JSON array (knowledge_bundle.json)")
+    parser.add_argument("--strict", action="store_true", help="verify: stop at the first invalid entry and exit with status 1 on failure")
+    parser.add_argument("--full", action="store_true", help="Re-parse every file instead of reusing unchanged entries from the previous bundle")
     
     args = parser.parse_args()
 
     if args.json or args.all:
-        bundle_to_json()
+        bundle_to_json(args.full, args.legacy_array)
     if args.zip or args.all:
-        create_zip_archive()
+        create_zip_archive(args.compressor, args.level)
     if args.verify or args.all:
-        verify_bundle()
+        if not verify_bundle(args.legacy_array, args.strict) and args.strict:
+            sys.exit(1)
     
     if not (args.json or args.zip or args.verify or args.all):
         print("[INFO] No action specified. Use --json, --zip, --verify, or --all.")
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "ARCHIVE-EXPORT.py"
+MANIFEST = "knowledge-archive-backup.manifest.json"
+
+
+class IncrementalBackupTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.archive = self.root / "knowledge-archive"
+        self.archive.mkdir()
+        for name in ("a", "b", "c"):
+            self.write(f"{name}.md", f"body {name}\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        (self.archive / name).write_text(text, encoding="utf-8")
+
+    def export(self, *args):
+        return subprocess.run([sys.executable, str(SCRIPT), *args], cwd=self.root, check=True,
+                              capture_output=True, text=True).stdout
+
+    def backup_path(self):
+        return next(self.root.glob("knowledge-archive-backup-*.ndjson"))
+
+    def records(self):
+        with open(self.backup_path(), encoding="utf-8") as f:
+            return {r["path"]: r["content"] for r in map(json.loads, f)}
+
+    def expected(self, **changes):
+        contents = {f"knowledge-archive/{name}.md": f"body {name}\n" for name in ("a", "b", "c")}
+        for name, text in changes.items():
+            if text is None:
+                contents.pop(f"knowledge-archive/{name}.md")
+            else:
+                contents[f"knowledge-archive/{name}.md"] = text
+        return contents
+
+    def test_unchanged_files_are_spliced(self):
+        self.assertIn("3 files bundled (0 unchanged)", self.export())
+        first = self.backup_path().read_bytes()
+        self.assertIn("3 files bundled (3 unchanged)", self.export())
+        self.assertEqual(self.backup_path().read_bytes(), first)
+
+    def test_modified_file_is_reread(self):
+        self.export()
+        self.write("b.md", "edited b, now longer\n")
+        self.assertIn("3 files bundled (2 unchanged)", self.export())
+        self.assertEqual(self.records(), self.expected(b="edited b, now longer\n"))
+
+    def test_deleted_file_is_dropped(self):
+        self.export()
+        (self.archive / "c.md").unlink()
+        self.assertIn("2 files bundled (2 unchanged)", self.export())
+        self.assertEqual(self.records(), self.expected(c=None))
+        manifest = json.loads((self.root / MANIFEST).read_text(encoding="utf-8"))
+        self.assertNotIn("knowledge-archive/c.md", manifest["files"])
+
+    def test_corrupt_manifest_forces_full_read(self):
+        self.export()
+        for text in ("{not json", '{"files": []}', '{"files": {"knowledge-archive/a.md": 1}}'):
+            (self.root / MANIFEST).write_text(text, encoding="utf-8")
+            self.assertIn("3 files bundled (0 unchanged)", self.export())
+            self.assertEqual(self.records(), self.expected())
+
+    def test_stale_backup_bytes_are_not_spliced(self):
+        self.export()
+        # Same size and offsets, different bytes: the recorded CRC no longer matches
+        backup = self.backup_path()
+        backup.write_bytes(backup.read_bytes().replace(b"body b", b"BODY B"))
+        self.assertIn("3 files bundled (2 unchanged)", self.export())
+        self.assertEqual(self.records(), self.expected())
+
+    def test_truncated_backup_is_not_spliced(self):
+        self.export()
+        manifest_path = self.root / MANIFEST
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        backup = self.backup_path()
+        backup.write_bytes(backup.read_bytes()[:-4])
+        manifest["backup_size"] = backup.stat().st_size
+        manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+        self.assertIn("3 files bundled (2 unchanged)", self.export())
+        self.assertEqual(self.records(), self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import csv
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "ARCHIVE-TOOLKIT.py"
+
+
+class CrlfFrontmatterTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        staging = self.root / "notebooklm-import-raw"
+        staging.mkdir()
+        (staging / "crlf.md").write_bytes(b"---\r\ntitle: crlf\r\n---\r\nBody with CRLF\r\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def toolkit(self, *args):
+        subprocess.run([sys.executable, str(SCRIPT), *args], cwd=self.root, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def test_snippet_skips_crlf_frontmatter(self):
+        self.toolkit("init")
+        with open(self.root / "classification-manifest.csv", newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["snippet"] for row in rows], ["Body with CRLF"])
+
+    def test_organize_replaces_crlf_frontmatter(self):
+        self.toolkit("init")
+        self.toolkit("run")
+        organized = list((self.root / "knowledge-archive").rglob("*crlf*.md"))
+        self.assertEqual(len(organized), 1)
+        data = organized[0].read_bytes()
+        self.assertNotIn(b"title: crlf", data)
+        self.assertEqual(data.count(b"\n---\n"), 1)
+        self.assertTrue(data.endswith(b"---\n\nBody with CRLF\r\n"))
+
+
+class SnippetCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.staging = self.root / "notebooklm-import-raw"
+        self.staging.mkdir()
+        self.write("a.md", "Alpha body text\n")
+        self.write("b.md", "Beta body text\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        (self.staging / name).write_text(text, encoding="utf-8")
+
+    def snippets(self):
+        subprocess.run([sys.executable, str(SCRIPT), "init"], cwd=self.root, check=True,
+                       stdout=subprocess.DEVNULL)
+        with open(self.root / "classification-manifest.csv", newline='', encoding='utf-8') as f:
+            return {row["filename"]: row["snippet"] for row in csv.DictReader(f)}
+
+    def cache(self):
+        return json.loads((self.root / ".cache" / "snippets.json").read_text(encoding="utf-8"))
+
+    def write_cache(self, cache):
+        (self.root / ".cache" / "snippets.json").write_text(json.dumps(cache), encoding="utf-8")
+
+    def test_unchanged_files_come_from_the_cache(self):
+        self.snippets()
+        cache = self.cache()
+        for entry in cache["manifest"].values():
+            entry[0] = "cached snippet"
+        self.write_cache(cache)
+        self.assertEqual(self.snippets(), {"a.md": "cached snippet", "b.md": "cached snippet"})
+
+    def test_modified_file_is_reanalyzed(self):
+        self.snippets()
+        self.write("a.md", "Alpha body text, edited\n")
+        self.assertEqual(self.snippets(), {"a.md": "Alpha body text, edited", "b.md": "Beta body text"})
+
+    def test_deleted_file_drops_out(self):
+        self.snippets()
+        (self.staging / "b.md").unlink()
+        self.assertEqual(self.snippets(), {"a.md": "Alpha body text"})
+        self.assertEqual(len(self.cache()["manifest"]), 1)
+
+    def test_corrupt_cache_is_recomputed(self):
+        expected = self.snippets()
+        malformed = {"manifest": {key: "x" for key in self.cache()["manifest"]}}
+        for cache in ("{not json", {"manifest": [1, 2]}, malformed):
+            if isinstance(cache, str):
+                (self.root / ".cache" / "snippets.json").write_text(cache, encoding="utf-8")
+            else:
+                self.write_cache(cache)
+            self.assertEqual(self.snippets(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import csv
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "directive" / "archive_toolkit.py"
+
+
+class ToolkitTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.staging = self.root / "notebooklm-import-raw"
+        self.staging.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def toolkit(self, *args):
+        return subprocess.run([sys.executable, str(SCRIPT), *args], cwd=self.root, check=True,
+                              capture_output=True, text=True).stdout
+
+    def write_manifest(self, *names):
+        manifests = self.root / "manifests"
+        manifests.mkdir(exist_ok=True)
+        with open(manifests / "classification-manifest.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(("filepath", "filename", "pattern_domain", "pattern_tags", "maturation_stage", "snippet"))
+            writer.writerows((name, name, "tradecraft", "a, b", "raw", "") for name in names)
+
+
+class LinkValidationTest(ToolkitTestCase):
+    def test_link_text_with_brackets_is_not_an_orphan(self):
+        (self.staging / "notes [draft].md").write_text("Draft body\n", encoding="utf-8")
+        (self.staging / "plain.md").write_text("Plain body\n", encoding="utf-8")
+        self.write_manifest("notes [draft].md", "plain.md")
+        self.toolkit("run")
+
+        out = self.toolkit("validate")
+        self.assertNotIn("[ORPHAN]", out)
+        self.assertNotIn("[BROKEN LINK]", out)
+        self.assertIn("[SUCCESS]", out)
+
+
+class OrganizeCacheTest(ToolkitTestCase):
+    def test_edited_source_is_organized_again(self):
+        (self.staging / "kept.md").write_text("Kept body\n", encoding="utf-8")
+        (self.staging / "edited.md").write_text("First body\n", encoding="utf-8")
+        self.write_manifest("kept.md", "edited.md")
+        self.toolkit("run")
+        dest = self.root / "archive" / "tradecraft" / "experiential_data"
+        self.assertTrue((dest / "edited.md").read_text(encoding="utf-8").endswith("First body\n"))
+
+        (self.staging / "edited.md").write_text("Second, longer body\n", encoding="utf-8")
+        out = self.toolkit("run")
+        self.assertIn("[MOVE] edited.md", out)
+        self.assertNotIn("[MOVE] kept.md", out)
+        self.assertIn("Skipped 1 unchanged files", out)
+        self.assertTrue((dest / "edited.md").read_text(encoding="utf-8").endswith("Second, longer body\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
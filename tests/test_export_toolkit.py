@@ -0,0 +1,198 @@
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+SCRIPT = Path(__file__).resolve().parent.parent / "directive" / "export_toolkit.py"
+
+FILE_COUNT = 300
+
+
+class BundleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.archive = self.root / "archive"
+        self.archive.mkdir()
+        for name in ("a", "b", "c"):
+            (self.archive / f"{name}.md").write_text(f"---\npatterndomain: {name}\n---\nbody {name}\n", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def bundle(self):
+        out = subprocess.run([sys.executable, str(SCRIPT), "--json"], cwd=self.root, check=True,
+                             capture_output=True, text=True).stdout
+        with open(self.root / "knowledge_bundle.ndjson", encoding="utf-8") as f:
+            entries = {e["filename"]: e for e in map(json.loads, f)}
+        return out, entries
+
+    def test_edited_file_is_reparsed(self):
+        out, entries = self.bundle()
+        self.assertIn("(0 unchanged)", out)
+        (self.archive / "a.md").write_text("---\npatterndomain: edited\n---\nnew body\n", encoding="utf-8")
+        (self.archive / "c.md").unlink()
+
+        out, entries = self.bundle()
+        self.assertIn("Bundled 2 files into JSON (1 unchanged)", out)
+        self.assertEqual(sorted(entries), ["a.md", "b.md"])
+        self.assertEqual(entries["a.md"]["metadata"], {"patterndomain": "edited"})
+        self.assertEqual(entries["a.md"]["content"], "new body")
+        self.assertEqual(entries["b.md"]["content"], "body b")
+
+
+def load_toolkit():
+    """Imports the script as a module; ROOT_DIR is taken from the current directory."""
+    spec = importlib.util.spec_from_file_location("export_toolkit", SCRIPT)
+    toolkit = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle its functions
+    sys.modules[spec.name] = toolkit
+    spec.loader.exec_module(toolkit)
+    return toolkit
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    ITEMS = [
+        {"a": "]}[{,", "b": ["]", "}"]},
+        "x \" ] y",
+        "back\\slash\\",
+        [1, [2, {"c": "]"}]],
+        12345,
+        -1.5e3,
+        True,
+        None,
+        "\u00e9 \u00fc"
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.toolkit = load_toolkit()
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop("export_toolkit", None)
+
+    def parse(self, text, chunk_size=None):
+        f = io.StringIO(text)
+        if chunk_size is None:
+            return list(self.toolkit.iter_json_array(f))
+        return list(self.toolkit.iter_json_array(f, chunk_size))
+
+    def test_tokens_split_across_chunks(self):
+        for indent in (None, 2):
+            text = json.dumps(self.ITEMS, indent=indent)
+            for chunk_size in range(1, 24):
+                self.assertEqual(self.parse(text, chunk_size), self.ITEMS, (indent, chunk_size))
+            self.assertEqual(self.parse(text), self.ITEMS)
+
+    def test_empty_array_and_trailing_whitespace(self):
+        self.assertEqual(self.parse("[]"), [])
+        self.assertEqual(self.parse(" \n[ ]\n\n", 1), [])
+        self.assertEqual(self.parse("[1]\n  \n", 2), [1])
+
+    def test_trailing_data_is_rejected(self):
+        for text in ("[1] x", "[1]]", "[1][2]", "[] ,", '[{"a": 1}]\n{"b": 2}'):
+            for chunk_size in (1, 3, 64):
+                with self.assertRaises(ValueError, msg=(text, chunk_size)):
+                    self.parse(text, chunk_size)
+
+    def test_truncated_input_is_rejected(self):
+        for text in ("", "[", "[1, 2", '[{"a": 1}', '["abc', '["a\\', "[1,", "[tru"):
+            for chunk_size in (1, 3, 64):
+                with self.assertRaises(ValueError, msg=(text, chunk_size)):
+                    self.parse(text, chunk_size)
+
+    def test_malformed_input_is_rejected(self):
+        for text in ("{}", "1", "[1 2]", "[1,]", "[,1]", "[1;2]", '["a" "b"]', "[01]"):
+            for chunk_size in (1, 3, 64):
+                with self.assertRaises(ValueError, msg=(text, chunk_size)):
+                    self.parse(text, chunk_size)
+
+
+class ZipLevelTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "archive").mkdir()
+        (self.root / "archive" / "note.md").write_text("---\npatterndomain: d\n---\nbody\n", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def export(self, *args):
+        return subprocess.run([sys.executable, str(SCRIPT), "--zip", *args], cwd=self.root, check=True,
+                              capture_output=True, text=True).stdout
+
+    def test_out_of_range_level_keeps_previous_archive(self):
+        self.export()
+        zip_path = self.root / "knowledge_archive.zip"
+        previous = zip_path.read_bytes()
+        for args in (["--level", "42"], ["--compressor", "bzip2", "--level", "0"], ["--compressor", "stored", "--level", "1"]):
+            self.assertIn("[ERROR]", self.export(*args))
+            self.assertEqual(zip_path.read_bytes(), previous)
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()), ["archive", "knowledge_archive.zip"])
+
+    def test_level_in_range(self):
+        self.assertIn("[SUCCESS]", self.export("--compressor", "bzip2", "--level", "9"))
+        with zipfile.ZipFile(self.root / "knowledge_archive.zip") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ["archive/note.md"])
+
+
+class BatchedBundleTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        archive = self.root / "archive"
+        archive.mkdir()
+        for i in range(FILE_COUNT):
+            (archive / f"f{i}.md").write_text(f"---\npatterndomain: d{i}\n---\nbody {i}\n", encoding="utf-8")
+        (archive / "bad.md").write_bytes(b"---\n\xff\xfe\n---\nbody\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def bundle_paths(self):
+        with open(self.root / "knowledge_bundle.ndjson", encoding="utf-8") as f:
+            return sorted(json.loads(line)["path"] for line in f)
+
+    def expected_paths(self, skip=()):
+        return sorted(f"archive/f{i}.md" for i in range(FILE_COUNT) if i not in skip)
+
+    def test_unreadable_file_is_skipped_across_batches(self):
+        for args in (["--json"], ["--json"], ["--json", "--full"]):
+            result = subprocess.run([sys.executable, str(SCRIPT), *args], cwd=self.root, check=True,
+                                    capture_output=True, text=True)
+            self.assertIn("[WARN] Failed to process bad.md", result.stdout)
+            self.assertEqual(self.bundle_paths(), self.expected_paths())
+
+    def test_stat_failure_is_skipped(self):
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            toolkit = load_toolkit()
+            real_stat = os.stat
+            missing = str(self.root / "archive" / "f7.md")
+
+            def stat(path, *args, **kwargs):
+                if os.fspath(path) == missing:
+                    raise FileNotFoundError(2, "No such file or directory", missing)
+                return real_stat(path, *args, **kwargs)
+
+            with mock.patch("os.stat", stat), mock.patch("builtins.print"):
+                toolkit.bundle_to_json()
+        finally:
+            sys.modules.pop("export_toolkit", None)
+            os.chdir(cwd)
+        self.assertEqual(self.bundle_paths(), self.expected_paths(skip={7}))
+
+
+if __name__ == "__main__":
+    unittest.main()